@@ -0,0 +1,185 @@
+"""
+Group-by aggregation kernels for integer-coded keys.
+
+Categorical columns and small-range integer columns (years, months,
+delivery days, interned IDs) map directly onto dense group codes, so a
+group-by sum, count or mean is one ``np.bincount`` per statistic instead of
+a hash-based pandas ``groupby``.  Keys that are not coded fall back to
+pandas.  Either way results match ``groupby(..., observed=True)``: only
+groups that occur are returned, in sorted key order, and NaN keys are
+dropped.
+"""
+
+import numpy as np
+import pandas as pd
+
+
+# Integer keys are coded as ``value - min``.  Past this many slots per row
+# (or the floor below) the bincount arrays would be mostly empty, and
+# pandas' hash grouping is the better choice.
+_MAX_SLOTS_PER_ROW = 4
+_MIN_SLOTS = 1 << 16
+
+
+# ---------------------------------------------------------------------------
+# Key coding
+# ---------------------------------------------------------------------------
+
+def dense_codes(keys):
+    """Dense group codes for a categorical or small-range integer Series.
+
+    Parameters
+    ----------
+    keys : pd.Series
+
+    Returns
+    -------
+    tuple or None
+        ``(codes, labels)``: int64 positions into ``labels``, with -1 for
+        missing keys.  ``labels`` is a Categorical for categorical keys and
+        an integer array otherwise.  None when *keys* is not coded (strings,
+        floats, nullable integers, or integers spread too thinly).
+    """
+    dtype = keys.dtype
+    if isinstance(dtype, pd.CategoricalDtype):
+        labels = pd.Categorical.from_codes(
+            np.arange(len(dtype.categories)), dtype=dtype
+        )
+        return keys.cat.codes.to_numpy(dtype=np.int64), labels
+    if isinstance(dtype, np.dtype) and np.issubdtype(dtype, np.integer):
+        values = keys.to_numpy()
+        if len(values) == 0:
+            return values.astype(np.int64), np.array([], dtype=dtype)
+        low, high = int(values.min()), int(values.max())
+        if high - low >= max(len(values) * _MAX_SLOTS_PER_ROW, _MIN_SLOTS):
+            return None
+        codes = np.subtract(values, low, dtype=np.int64)
+        return codes, np.arange(low, high + 1).astype(dtype)
+    return None
+
+
+def _combined_codes(keys):
+    """Mixed-radix codes over several keys; None if any key is not coded."""
+    codes, levels = None, []
+    for key in keys:
+        coded = dense_codes(key)
+        if coded is None:
+            return None
+        key_codes, labels = coded
+        if codes is None:
+            codes = key_codes
+        else:
+            missing = (codes < 0) | (key_codes < 0)
+            codes = codes * len(labels) + key_codes
+            codes[missing] = -1
+        levels.append(labels)
+        slots = int(np.prod([len(level) for level in levels], dtype=float))
+        if slots > max(len(codes) * _MAX_SLOTS_PER_ROW, _MIN_SLOTS):
+            return None
+    return codes, levels
+
+
+def _result_index(observed, levels, keys):
+    """Index of the observed slots, shaped like pandas' groupby index."""
+    names = [key.name for key in keys]
+    if len(levels) == 1:
+        return pd.Index(levels[0][observed], name=names[0])
+    positions = np.unravel_index(observed, [len(level) for level in levels])
+    return pd.MultiIndex.from_arrays(
+        [level[pos] for level, pos in zip(levels, positions)], names=names
+    )
+
+
+# ---------------------------------------------------------------------------
+# Kernels
+# ---------------------------------------------------------------------------
+
+def _aggregate(keys, values, how):
+    """Shared body of ``group_sum`` / ``group_size`` / ``group_mean``."""
+    keys = [keys] if isinstance(keys, pd.Series) else list(keys)
+    coded = _combined_codes(keys)
+    if coded is None:
+        target = values if values is not None else pd.Series(
+            0, index=keys[0].index)
+        return getattr(target.groupby(keys, observed=True), how)()
+
+    codes, levels = coded
+    slots = int(np.prod([len(level) for level in levels]))
+    valid = codes >= 0
+    has_missing = not valid.all()
+    if has_missing:
+        codes = codes[valid]
+    sizes = np.bincount(codes, minlength=slots)
+    observed = np.flatnonzero(sizes)
+    index = _result_index(observed, levels, keys)
+    if how == "size":
+        return pd.Series(sizes[observed], index=index, dtype="int64")
+
+    weights = values.to_numpy(dtype=np.float64, na_value=np.nan)
+    if has_missing:
+        weights = weights[valid]
+    present = ~np.isnan(weights)
+    all_present = present.all()
+    if not all_present:
+        weights = np.where(present, weights, 0.0)
+    # bincount returns int64 for empty input; keep the dtype it has otherwise.
+    sums = np.bincount(codes, weights=weights, minlength=slots)[observed]
+    sums = sums.astype(np.float64, copy=False)
+    if how == "mean":
+        counts = (sizes if all_present
+                  else np.bincount(codes[present], minlength=slots))
+        with np.errstate(invalid="ignore", divide="ignore"):
+            sums = sums / counts[observed]
+    return pd.Series(sums, index=index, name=values.name)
+
+
+def group_sum(keys, values):
+    """Sum *values* per group of *keys* (NaN values count as zero).
+
+    Parameters
+    ----------
+    keys : pd.Series or list of pd.Series
+        One or more grouping columns aligned with *values*.  Several keys
+        give a MultiIndex result.
+    values : pd.Series
+        Numeric values to sum.
+
+    Returns
+    -------
+    pd.Series
+        Sums indexed by the observed keys, named like *values*.  Coded keys
+        return float64 sums.
+    """
+    return _aggregate(keys, values, "sum")
+
+
+def group_size(keys):
+    """Row count per group of *keys*.
+
+    Parameters
+    ----------
+    keys : pd.Series or list of pd.Series
+
+    Returns
+    -------
+    pd.Series
+        int64 counts indexed by the observed keys.
+    """
+    return _aggregate(keys, None, "size")
+
+
+def group_mean(keys, values):
+    """Mean of the non-missing *values* per group of *keys*.
+
+    Parameters
+    ----------
+    keys : pd.Series or list of pd.Series
+    values : pd.Series
+
+    Returns
+    -------
+    pd.Series
+        Means indexed by the observed keys (NaN for a group whose values
+        are all missing), named like *values*.
+    """
+    return _aggregate(keys, values, "mean")
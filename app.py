@@ -7,14 +7,25 @@ business_metrics modules extracted from the EDA notebook.
 Run with:  streamlit run app.py
 """
 
+import functools
 import math
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from types import MappingProxyType
+
 import streamlit as st
 import pandas as pd
 import plotly.graph_objects as go
-import plotly.express as px
+import plotly.io as pio
 
 import data_loader as dl
 import business_metrics as bm
+import charts
+from result_cache import ResultCache
+
+# Derived frames share unchanged columns instead of copying them
+dl.enable_copy_on_write()
 
 # ── Page config ──────────────────────────────────────────────────────────────
 st.set_page_config(
@@ -134,28 +145,153 @@ def render_stars(score, max_stars=5):
 
 # ── Load & cache data ───────────────────────────────────────────────────────
 
-@st.cache_data
-def load_all_data():
-    datasets = dl.load_datasets("ecommerce_data")
+# Metrics behind the dashboard panels; only the columns they need are read.
+DASHBOARD_METRICS = (
+    "total_revenue", "total_orders", "average_order_value",
+    "monthly_revenue", "average_mom_growth", "revenue_by_category",
+    "revenue_by_state", "avg_review_by_delivery_bucket",
+    "average_delivery_days", "average_review_score",
+)
+
+
+@dataclass(frozen=True)
+class LoadedData:
+    """Result of ``load_all_data``, kept to update the next load.
+
+    Attributes
+    ----------
+    tables : dl.SharedTables
+        Delivered order facts, daily cube, prefix sums and review pairs.
+    rows : Mapping[str, int]
+        Row count of each source table at this load.
+    labels : Mapping[str, pd.Index]
+        ID lookup from ``dl.intern_keys`` for this load.
+    """
+
+    tables: dl.SharedTables
+    rows: MappingProxyType
+    labels: MappingProxyType
+
+
+@st.cache_resource(max_entries=1)
+def load_all_data(data_version, _previous=None):
+    """Load and prepare all data; *data_version* only keys the cache.
+
+    The tables are built once per data version and shared by every session
+    as frozen ``SharedTables`` (no per-session copies; modifying them
+    raises).  *_previous* is the ``LoadedData`` the calling session last
+    saw (not part of the cache key); when orders and order items only had
+    rows appended since then, just those rows are parsed and merged into
+    its derived tables.
+    """
+    columns = dl.source_columns(bm.required_columns(*DASHBOARD_METRICS))
+    datasets, report = dl.load_datasets("ecommerce_data", parallel="thread",
+                                        columns=columns, return_report=True)
+    since = dl.appended_since(report,
+                              _previous.rows if _previous else None)
+    # IDs are never displayed; the lookup only keeps the codes of appended
+    # rows consistent with the previous load.
+    datasets, labels = dl.intern_keys(
+        datasets, labels=_previous.labels if since is not None else None)
     orders = dl.parse_order_dates(datasets["orders"])
     order_items = datasets["order_items"]
     products = datasets["products"]
     customers = datasets["customers"]
     reviews = datasets["reviews"]
 
-    sales_data = dl.build_sales_data(order_items, orders)
-    delivered_all = dl.filter_delivered(sales_data)
-    delivered_all = dl.add_delivery_speed(delivered_all)
+    tables = None
+    if since is not None:
+        tables = dl.merge_appended(_previous.tables, since, order_items,
+                                   orders, products, customers, reviews)
+    if tables is None:
+        tables = dl.build_derived_tables(order_items, orders, products,
+                                         customers, reviews)
+
+    # Reviews are not append-only, so their distinct pairs are rebuilt.
+    return LoadedData(
+        tables=dl.SharedTables(tables + (dl.distinct_reviews(reviews),)),
+        rows=MappingProxyType({name: entry["rows"]
+                               for name, entry in report.items()}),
+        labels=MappingProxyType(labels),
+    )
 
-    return orders, order_items, products, customers, reviews, delivered_all
 
+# Memory budget for the per-range panel results below, shared by sessions.
+PANEL_CACHE_MB = 64
+# Threads computing the panels of a rerun while earlier panels render.
+PANEL_WORKERS = 5
+# Processes building the choropleth, the one figure slow enough to be worth
+# taking off the GIL (see ``charts``).
+MAP_WORKERS = 2
 
-orders, order_items, products, customers, reviews, delivered_all = load_all_data()
+
+@st.cache_resource
+def _panel_cache():
+    """Panel results keyed by panel, date range and data version."""
+    return ResultCache(PANEL_CACHE_MB * 2**20)
+
+
+@st.cache_resource
+def _panel_pool():
+    """Thread pool shared by every session's panel computations."""
+    return ThreadPoolExecutor(max_workers=PANEL_WORKERS,
+                              thread_name_prefix="panel")
+
+
+@st.cache_resource
+def _map_pool():
+    """Process pool shared by every session's choropleth builds.
+
+    Workers get this process's default plotly template (see
+    ``charts.start_pool``).
+    """
+    template = pio.templates[pio.templates.default].to_plotly_json()
+    return charts.start_pool(MAP_WORKERS, template)
+
+
+def _frozen(value):
+    """Read-only version of a panel result, safe to share between sessions."""
+    if isinstance(value, pd.DataFrame):
+        return dl.freeze_frame(value)
+    if isinstance(value, pd.Series):
+        return dl.freeze_frame(value.to_frame()).iloc[:, 0].rename(value.name)
+    if isinstance(value, tuple):
+        return tuple(_frozen(v) for v in value)
+    if isinstance(value, dict):
+        return MappingProxyType({k: _frozen(v) for k, v in value.items()})
+    if isinstance(value, go.Figure):
+        # Cached as its spec: plain data the cache can size, and never a
+        # live figure shared between sessions (see ``_figure``).
+        return MappingProxyType(value.to_dict())
+    return value
+
+
+def _figure(spec):
+    """Fresh figure from a cached spec; the cached spec is left untouched.
+
+    The spec was validated when the figure was built, so it is not
+    validated again (that would cost more than building the chart).
+    """
+    return go.Figure(dict(spec), _validate=False)
+
+
+# Started before the data loads so the workers warm up meanwhile.
+map_pool = _map_pool()
+
+# Keyed on the files' size/mtime, so changed CSVs refresh everything derived
+# from them (cube, prefix sums) on the next rerun: appended rows are merged
+# in, edited files are rebuilt.  Each session passes on the load it last saw
+# so the merge never reads state another session is replacing.  Unpacking
+# verifies that no session has modified the shared tables.
+data_version = dl.data_version("ecommerce_data")
+loaded = load_all_data(data_version, st.session_state.get("loaded_data"))
+st.session_state["loaded_data"] = loaded
+delivered_orders, cube, prefix_sums, review_pairs = loaded.tables
 
 # ── Header row ───────────────────────────────────────────────────────────────
 
-min_date = delivered_all["order_purchase_timestamp"].min().date()
-max_date = delivered_all["order_purchase_timestamp"].max().date()
+min_date = delivered_orders["order_purchase_timestamp"].min().date()
+max_date = delivered_orders["order_purchase_timestamp"].max().date()
 
 header_left, header_right = st.columns([3, 2])
 
@@ -173,45 +309,142 @@ with header_right:
 
 st.markdown("---")
 
-# ── Filter data by selected range ───────────────────────────────────────────
+# ── Panels ───────────────────────────────────────────────────────────────────
+# Each panel is a fragment that takes the filter state it depends on as
+# arguments: the selected range and, for the KPI row and trend chart, the
+# comparison period derived from it.  A panel can rerun on its own, and its
+# data and figure come from the shared panel cache keyed on exactly those
+# inputs, so a rerun with unchanged inputs only re-sends the cached result.
 
-delivered_current = dl.filter_by_date_range(delivered_all, str(start_date), str(end_date))
+# Resolved here because worker threads have no Streamlit script context.
+panel_cache = _panel_cache()
+panel_pool = _panel_pool()
 
-# Build a comparison period of equal length directly before start_date
-period_days = (end_date - start_date).days
-comparison_end = start_date - pd.Timedelta(days=1)
-comparison_start = comparison_end - pd.Timedelta(days=period_days)
-delivered_previous = dl.filter_by_date_range(
-    delivered_all,
-    str(comparison_start),
-    str(comparison_end),
-)
 
-has_comparison = len(delivered_previous) > 0
+def _panel_key(name, inputs):
+    return (name, data_version) + tuple(str(value) for value in inputs)
 
-# ── Compute all KPI metrics ──────────────────────────────────────────────────
 
-rev_current = bm.total_revenue(delivered_current)
-rev_change = bm.revenue_growth(delivered_current, delivered_previous) if has_comparison else float("nan")
+def _panel(name, inputs):
+    """Panel *name*'s result for *inputs*, from the panel cache.
+
+    Revisiting a range, or another session viewing it, skips the
+    computation; a new data version misses and recomputes.  While a worker
+    is still computing the result this waits for that worker (and only
+    that one).  Figures come back as specs (see ``_frozen``); draw them
+    with ``_figure``.
+    """
+    compute, _ = PANELS[name]
+    return panel_cache.get_or_compute(_panel_key(name, inputs),
+                                      lambda: _frozen(compute(*inputs)))
+
+
+def _submit_panels(start_date, end_date, comparison_start, comparison_end):
+    """Start computing the panels a range misses, without waiting.
+
+    The fragments then render in layout order, each as soon as its own
+    result is ready.
+
+    Returns
+    -------
+    dict[str, Future]
+        Per missing panel, the seconds from submission until its result
+        was cached, queueing on the shared pool included.
+    """
+    missing = {}
+    for name, (_, uses_comparison) in PANELS.items():
+        inputs = (start_date, end_date)
+        if uses_comparison:
+            inputs += (comparison_start, comparison_end)
+        if _panel_key(name, inputs) not in panel_cache:
+            missing[name] = inputs
+    if not missing:
+        return {}
+
+    # Slice once here: lru_cache does not stop concurrent panels from all
+    # taking the same slice on a miss.
+    _cube_slice(start_date, end_date)
+    if _has_comparison(comparison_start, comparison_end):
+        _cube_slice(comparison_start, comparison_end)
+    if "delivery_satisfaction" in missing:
+        _delivered_slice(start_date, end_date)
+
+    submitted = time.perf_counter()
+
+    def timed(name, inputs):
+        _panel(name, inputs)
+        return time.perf_counter() - submitted
+
+    return {name: panel_pool.submit(timed, name, inputs)
+            for name, inputs in missing.items()}
+
 
-avg_mom = bm.average_mom_growth(delivered_current) if len(delivered_current) > 0 else float("nan")
+def _comparison_period(start_date, end_date):
+    """Period of equal length directly before *start_date*."""
+    period_days = (end_date - start_date).days
+    comparison_end = start_date - pd.Timedelta(days=1)
+    return comparison_end - pd.Timedelta(days=period_days), comparison_end
 
-aov_current = bm.average_order_value(delivered_current) if len(delivered_current) > 0 else 0.0
-aov_change = bm.aov_growth(delivered_current, delivered_previous) if has_comparison else float("nan")
 
-orders_current = bm.total_orders(delivered_current)
-orders_change = bm.order_count_growth(delivered_current, delivered_previous) if has_comparison else float("nan")
+# Slices are only taken when a panel misses the cache.  Headline KPIs come
+# from prefix sums (two lookups per period), the trend, category and state
+# charts from the daily cube; only the delivery bucket chart needs
+# order-level rows.  The caches hold a few sessions' ranges, so a slice
+# taken by ``_submit_panels`` is still there when the workers ask for it.
+@functools.lru_cache(maxsize=8)
+def _cube_slice(start, end):
+    return dl.filter_cube(cube, str(start), str(end))
 
-review_summary = bm.review_delivery_summary(delivered_current, reviews)
-avg_delivery = bm.average_delivery_days(review_summary) if len(review_summary) > 0 else 0.0
-avg_review = bm.average_review_score(review_summary) if len(review_summary) > 0 else 0.0
 
-if has_comparison:
-    review_summary_prev = bm.review_delivery_summary(delivered_previous, reviews)
-    avg_delivery_prev = bm.average_delivery_days(review_summary_prev) if len(review_summary_prev) > 0 else 0.0
-    delivery_change = (avg_delivery - avg_delivery_prev) / avg_delivery_prev if avg_delivery_prev else float("nan")
-else:
-    delivery_change = float("nan")
+@functools.lru_cache(maxsize=4)
+def _delivered_slice(start, end):
+    return dl.filter_by_date_range(delivered_orders, str(start), str(end))
+
+
+def _has_comparison(comparison_start, comparison_end):
+    return prefix_sums.totals(comparison_start, comparison_end)["items"] > 0
+
+
+# ── Compute all KPI metrics ──────────────────────────────────────────────────
+
+def _compute_kpis(start_date, end_date, comparison_start, comparison_end):
+    has_comparison = _has_comparison(comparison_start, comparison_end)
+    kpi_current = bm.summarize_totals(prefix_sums.totals(start_date, end_date))
+    kpi_previous = bm.summarize_totals(
+        prefix_sums.totals(comparison_start, comparison_end))
+
+    def change(current, previous):
+        if not has_comparison:
+            return float("nan")
+        return bm.relative_change(current, previous)
+
+    cube_current = _cube_slice(start_date, end_date)
+    review_count = kpi_current["review_count"]
+    aov = (kpi_current["average_order_value"] if kpi_current["orders"] > 0
+           else 0.0)
+    avg_delivery = (kpi_current["average_delivery_days"] if review_count > 0
+                    else 0.0)
+    avg_delivery_prev = (kpi_previous["average_delivery_days"]
+                         if kpi_previous["review_count"] > 0 else 0.0)
+    return {
+        "revenue": kpi_current["revenue"],
+        "revenue_change": change(kpi_current["revenue"],
+                                 kpi_previous["revenue"]),
+        "average_mom_growth": (bm.cube_average_mom_growth(cube_current)
+                               if len(cube_current) > 0 else float("nan")),
+        "average_order_value": aov,
+        "average_order_value_change": change(
+            aov, kpi_previous["average_order_value"]),
+        "orders": kpi_current["orders"],
+        "orders_change": change(kpi_current["orders"],
+                                kpi_previous["orders"]),
+        "average_delivery_days": avg_delivery,
+        "delivery_change": (change(avg_delivery, avg_delivery_prev)
+                            if avg_delivery_prev else float("nan")),
+        "average_review_score": (kpi_current["average_review_score"]
+                                 if review_count > 0 else 0.0),
+        "review_count": review_count,
+    }
 
 
 # ── Helper: build a delta line ──────────────────────────────────────────────
@@ -240,83 +473,88 @@ def _delta_html(value, invert=False):
 
 SPACER = '<div class="card-spacer">&nbsp;</div>'
 
-kpi_cards = [
-    # 1) Total Revenue — 3 lines + 1 spacer
-    f"""<div class="kpi-card">
-        <div class="card-label">Total Revenue</div>
-        <div class="card-value">{fmt_currency_short(rev_current)}</div>
-        {_delta_html(rev_change)}
-        {SPACER}
-    </div>""",
-
-    # 2) Monthly Growth — 2 lines + 2 spacers
-    f"""<div class="kpi-card">
-        <div class="card-label">Monthly Growth (Avg MoM)</div>
-        <div class="card-value">{fmt_delta(avg_mom)}</div>
-        {SPACER}
-        {SPACER}
-    </div>""",
-
-    # 3) Average Order Value — 3 lines + 1 spacer
-    f"""<div class="kpi-card">
-        <div class="card-label">Average Order Value</div>
-        <div class="card-value">${aov_current:,.2f}</div>
-        {_delta_html(aov_change)}
-        {SPACER}
-    </div>""",
-
-    # 4) Total Orders — 3 lines + 1 spacer
-    f"""<div class="kpi-card">
-        <div class="card-label">Total Orders</div>
-        <div class="card-value">{orders_current:,}</div>
-        {_delta_html(orders_change)}
-        {SPACER}
-    </div>""",
-
-    # 5) Avg Delivery Time — 3 lines + 1 spacer
-    f"""<div class="kpi-card">
-        <div class="card-label">Avg Delivery Time</div>
-        <div class="card-value">{avg_delivery:.1f} days</div>
-        {_delta_html(delivery_change, invert=True)}
-        {SPACER}
-    </div>""",
-
-    # 6) Avg Review Score — 4 lines (no spacer needed)
-    f"""<div class="kpi-card">
-        <div class="card-label">Avg Review Score</div>
-        <div class="card-value">{avg_review:.2f} / 5.00</div>
-        <div class="stars">{render_stars(avg_review)}</div>
-        <div class="card-subtitle">Based on {len(review_summary):,} reviews</div>
-    </div>""",
-]
-
-kpi_cols = st.columns(6)
-for col, html in zip(kpi_cols, kpi_cards):
-    with col:
-        st.markdown(html, unsafe_allow_html=True)
 
-st.markdown("")
+@st.fragment
+def kpi_row(start_date, end_date, comparison_start, comparison_end):
+    kpis = _panel("kpis",
+                  (start_date, end_date, comparison_start, comparison_end))
+    avg_review = kpis["average_review_score"]
+
+    kpi_cards = [
+        # 1) Total Revenue — 3 lines + 1 spacer
+        f"""<div class="kpi-card">
+            <div class="card-label">Total Revenue</div>
+            <div class="card-value">{fmt_currency_short(kpis["revenue"])}</div>
+            {_delta_html(kpis["revenue_change"])}
+            {SPACER}
+        </div>""",
+
+        # 2) Monthly Growth — 2 lines + 2 spacers
+        f"""<div class="kpi-card">
+            <div class="card-label">Monthly Growth (Avg MoM)</div>
+            <div class="card-value">{fmt_delta(kpis["average_mom_growth"])}</div>
+            {SPACER}
+            {SPACER}
+        </div>""",
+
+        # 3) Average Order Value — 3 lines + 1 spacer
+        f"""<div class="kpi-card">
+            <div class="card-label">Average Order Value</div>
+            <div class="card-value">${kpis["average_order_value"]:,.2f}</div>
+            {_delta_html(kpis["average_order_value_change"])}
+            {SPACER}
+        </div>""",
+
+        # 4) Total Orders — 3 lines + 1 spacer
+        f"""<div class="kpi-card">
+            <div class="card-label">Total Orders</div>
+            <div class="card-value">{kpis["orders"]:,}</div>
+            {_delta_html(kpis["orders_change"])}
+            {SPACER}
+        </div>""",
+
+        # 5) Avg Delivery Time — 3 lines + 1 spacer
+        f"""<div class="kpi-card">
+            <div class="card-label">Avg Delivery Time</div>
+            <div class="card-value">{kpis["average_delivery_days"]:.1f} days</div>
+            {_delta_html(kpis["delivery_change"], invert=True)}
+            {SPACER}
+        </div>""",
+
+        # 6) Avg Review Score — 4 lines (no spacer needed)
+        f"""<div class="kpi-card">
+            <div class="card-label">Avg Review Score</div>
+            <div class="card-value">{avg_review:.2f} / 5.00</div>
+            <div class="stars">{render_stars(avg_review)}</div>
+            <div class="card-subtitle">Based on {kpis["review_count"]:,} reviews</div>
+        </div>""",
+    ]
 
-# ── Charts Grid (2x2) ───────────────────────────────────────────────────────
+    kpi_cols = st.columns(6)
+    for col, html in zip(kpi_cols, kpi_cards):
+        with col:
+            st.markdown(html, unsafe_allow_html=True)
 
-chart_top_left, chart_top_right = st.columns(2)
 
 # -- Revenue trend line chart --------------------------------------------------
-with chart_top_left:
-    monthly_current = bm.monthly_revenue(delivered_current)
-    monthly_current["period"] = "month"
-    monthly_current["label"] = monthly_current["month"].apply(
+
+def _month_labels(monthly):
+    return monthly.assign(label=monthly["month"].apply(
         lambda m: pd.Timestamp(2000, int(m), 1).strftime("%b")
-    )
+    ))
+
+
+def _revenue_trend_figure(start_date, end_date, comparison_start,
+                          comparison_end):
+    monthly_current = _month_labels(
+        bm.cube_monthly_revenue(_cube_slice(start_date, end_date)))
 
     fig_rev = go.Figure()
 
     # Previous period (dashed)
-    if has_comparison:
-        monthly_prev = bm.monthly_revenue(delivered_previous)
-        monthly_prev["label"] = monthly_prev["month"].apply(
-            lambda m: pd.Timestamp(2000, int(m), 1).strftime("%b")
-        )
+    if _has_comparison(comparison_start, comparison_end):
+        monthly_prev = _month_labels(bm.cube_monthly_revenue(
+            _cube_slice(comparison_start, comparison_end)))
         fig_rev.add_trace(go.Scatter(
             x=monthly_prev["label"],
             y=monthly_prev["revenue"],
@@ -356,11 +594,23 @@ with chart_top_left:
         margin=dict(l=20, r=20, t=60, b=20),
         height=380,
     )
-    st.plotly_chart(fig_rev, use_container_width=True)
+    return monthly_current, fig_rev
+
+
+@st.fragment
+def revenue_trend_panel(start_date, end_date, comparison_start,
+                        comparison_end):
+    _, fig_rev = _panel(
+        "revenue_trend",
+        (start_date, end_date, comparison_start, comparison_end))
+    st.plotly_chart(_figure(fig_rev), use_container_width=True)
+
 
 # -- Top 10 categories bar chart -----------------------------------------------
-with chart_top_right:
-    cat_rev = bm.revenue_by_category(delivered_current, products).head(10)
+
+def _top_categories_figure(start_date, end_date):
+    cat_rev = bm.cube_revenue_by_category(_cube_slice(start_date, end_date),
+                                          top_k=10)
 
     # Build blue gradient: darker for higher values
     max_val = cat_rev.max() if len(cat_rev) > 0 else 1
@@ -391,66 +641,37 @@ with chart_top_right:
         margin=dict(l=20, r=20, t=60, b=20),
         height=380,
     )
-    st.plotly_chart(fig_cat, use_container_width=True)
+    return cat_rev, fig_cat
+
+
+@st.fragment
+def top_categories_panel(start_date, end_date):
+    _, fig_cat = _panel("top_categories", (start_date, end_date))
+    st.plotly_chart(_figure(fig_cat), use_container_width=True)
 
-chart_bot_left, chart_bot_right = st.columns(2)
 
 # -- US choropleth map ---------------------------------------------------------
-with chart_bot_left:
-    state_revenue = bm.revenue_by_state(delivered_current, orders, customers)
-
-    fig_map = px.choropleth(
-        state_revenue,
-        locations="customer_state",
-        color="revenue",
-        locationmode="USA-states",
-        scope="usa",
-        color_continuous_scale=[
-            [0, "#d4e8f0"],
-            [0.35, "#6dafc9"],
-            [0.7, "#2C6E91"],
-            [1, "#123a50"],
-        ],
-        labels={"revenue": "Revenue", "customer_state": "State"},
-    )
-    # Add state abbreviation labels on the map
-    fig_map.add_trace(go.Scattergeo(
-        locations=state_revenue["customer_state"],
-        locationmode="USA-states",
-        text=state_revenue["customer_state"],
-        mode="text",
-        textfont=dict(size=9, color="#1e293b", family="Inter, sans-serif"),
-        showlegend=False,
-        hoverinfo="skip",
-    ))
 
-    fig_map.update_layout(
-        title="Revenue by State",
-        geo=dict(
-            lakecolor="white",
-            bgcolor="white",
-        ),
-        plot_bgcolor="white",
-        paper_bgcolor="white",
-        margin=dict(l=0, r=0, t=50, b=0),
-        height=380,
-        coloraxis_colorbar=dict(
-            tickprefix="$",
-            tickformat=".2s",
-        ),
-    )
-    st.plotly_chart(fig_map, use_container_width=True)
+def _state_map_figure(start_date, end_date):
+    state_revenue = bm.cube_revenue_by_state(_cube_slice(start_date, end_date))
+    # Built in a worker process; this thread only waits for the spec.
+    spec = map_pool.submit(charts.state_revenue_map, state_revenue).result()
+    return state_revenue, MappingProxyType(spec)
+
+
+@st.fragment
+def state_map_panel(start_date, end_date):
+    _, fig_map = _panel("state_revenue", (start_date, end_date))
+    st.plotly_chart(_figure(fig_map), use_container_width=True)
+
 
 # -- Satisfaction vs Delivery Time bar chart ------------------------------------
-with chart_bot_right:
-    by_bucket = bm.avg_review_by_delivery_bucket(review_summary)
 
-    # Ensure correct bucket ordering
-    bucket_order = ["1-3 days", "4-7 days", "8+ days"]
-    by_bucket["delivery_bucket"] = pd.Categorical(
-        by_bucket["delivery_bucket"], categories=bucket_order, ordered=True
-    )
-    by_bucket = by_bucket.sort_values("delivery_bucket")
+def _satisfaction_figure(start_date, end_date):
+    review_summary = bm.review_delivery_summary(
+        _delivered_slice(start_date, end_date), review_pairs)
+    # Buckets are an ordered categorical, so rows come out fastest first.
+    by_bucket = bm.avg_review_by_delivery_bucket(review_summary)
 
     fig_sat = go.Figure(go.Bar(
         x=by_bucket["delivery_bucket"],
@@ -471,5 +692,59 @@ with chart_bot_right:
         margin=dict(l=20, r=20, t=60, b=20),
         height=380,
     )
-    st.plotly_chart(fig_sat, use_container_width=True)
+    return by_bucket, fig_sat
+
+
+@st.fragment
+def satisfaction_panel(start_date, end_date):
+    _, fig_sat = _panel("delivery_satisfaction", (start_date, end_date))
+    st.plotly_chart(_figure(fig_sat), use_container_width=True)
+
+
+# ── Layout ───────────────────────────────────────────────────────────────────
+
+# Panel name -> (compute function, whether it also takes the comparison
+# period).  Computes run on worker threads: they only read the shared tables
+# and must not call Streamlit.
+PANELS = {
+    "kpis": (_compute_kpis, True),
+    "revenue_trend": (_revenue_trend_figure, True),
+    "top_categories": (_top_categories_figure, False),
+    "state_revenue": (_state_map_figure, False),
+    "delivery_satisfaction": (_satisfaction_figure, False),
+}
+
+comparison_start, comparison_end = _comparison_period(start_date, end_date)
+
+# Start the panels that miss the cache; each fragment below waits only for
+# its own result, so the KPI row renders while the charts are computed.
+panel_futures = _submit_panels(start_date, end_date, comparison_start,
+                               comparison_end)
 
+kpi_row(start_date, end_date, comparison_start, comparison_end)
+
+st.markdown("")
+
+# ── Charts Grid (2x2) ───────────────────────────────────────────────────────
+
+chart_top_left, chart_top_right = st.columns(2)
+chart_bot_left, chart_bot_right = st.columns(2)
+
+# Panels stream to the browser in this order, so the choropleth (the
+# slowest to send) is drawn last.
+with chart_top_left:
+    revenue_trend_panel(start_date, end_date, comparison_start,
+                        comparison_end)
+with chart_top_right:
+    top_categories_panel(start_date, end_date)
+with chart_bot_right:
+    satisfaction_panel(start_date, end_date)
+with chart_bot_left:
+    state_map_panel(start_date, end_date)
+
+# Every panel has rendered, so these are done (a failed panel has already
+# shown its error).  Timings of the latest rerun, empty when every panel
+# was cached, are kept in the session state.
+st.session_state["panel_seconds"] = {
+    name: future.result() for name, future in panel_futures.items()
+    if future.exception() is None}
@@ -0,0 +1,109 @@
+"""
+Benchmark the aggregation kernels against pandas groupby.
+
+Times ``group_sum`` / ``group_mean`` / ``group_size`` against the
+equivalent ``groupby(..., observed=True)`` call on the keys the dashboard
+metrics group by, using enriched delivered sales from the sample data
+(optionally repeated to get a larger frame), and checks that both give
+the same result.
+
+Run from the repository root:
+
+    python benchmarks/bench_aggregation.py [--scale 20] [--repeat 5]
+"""
+
+import argparse
+import os
+import sys
+import timeit
+
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import aggregation as agg  # noqa: E402
+import business_metrics as bm  # noqa: E402
+import data_loader as dl  # noqa: E402
+
+
+def load_sales(data_dir, scale):
+    """Enriched delivered sales with delivery days, scores and buckets."""
+    datasets = dl.load_datasets(data_dir)
+    orders = dl.parse_order_dates(datasets["orders"])
+    sales = dl.build_sales_data(datasets["order_items"], orders)
+    sales = dl.add_delivery_speed(dl.filter_delivered(sales))
+    sales = dl.enrich_sales(sales, datasets["products"], orders,
+                            datasets["customers"])
+    # Review rows per distinct (order, score), as the review metrics use.
+    sales = sales.merge(dl.distinct_reviews(datasets["reviews"]),
+                        on="order_id", how="left")
+    sales["delivery_bucket"] = bm.bucket_delivery_days(sales["delivery_days"])
+    if scale > 1:
+        sales = pd.concat([sales] * scale, ignore_index=True)
+    return sales
+
+
+def cases(sales):
+    """(label, kernel call, groupby call) for each grouping benchmarked."""
+    year_month = [sales["year"], sales["month"]]
+    return [
+        ("sum  by year, month",
+         lambda: agg.group_sum(year_month, sales["price"]),
+         lambda: sales.groupby(["year", "month"], observed=True)["price"]
+         .sum()),
+        ("sum  by category",
+         lambda: agg.group_sum(sales["product_category_name"],
+                               sales["price"]),
+         lambda: sales.groupby("product_category_name", observed=True)
+         ["price"].sum()),
+        ("sum  by state",
+         lambda: agg.group_sum(sales["customer_state"], sales["price"]),
+         lambda: sales.groupby("customer_state", observed=True)["price"]
+         .sum()),
+        ("mean by delivery bucket",
+         lambda: agg.group_mean(sales["delivery_bucket"],
+                                sales["review_score"]),
+         lambda: sales.groupby("delivery_bucket", observed=True)
+         ["review_score"].mean()),
+        ("mean by delivery days",
+         lambda: agg.group_mean(sales["delivery_days"],
+                                sales["review_score"]),
+         lambda: sales.groupby("delivery_days", observed=True)
+         ["review_score"].mean()),
+        ("size by category",
+         lambda: agg.group_size(sales["product_category_name"]),
+         lambda: sales.groupby("product_category_name", observed=True)
+         .size()),
+    ]
+
+
+def best_ms(func, repeat):
+    """Best time of *repeat* runs, each averaged over enough calls."""
+    timer = timeit.Timer(func)
+    number, _ = timer.autorange()
+    return min(timer.repeat(repeat, number)) / number * 1e3
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--data-dir", default="ecommerce_data")
+    parser.add_argument("--scale", type=int, default=1,
+                        help="repeat the sales rows this many times")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args(argv)
+
+    sales = load_sales(args.data_dir, args.scale)
+    print(f"{len(sales):,} rows, pandas {pd.__version__}\n")
+    print(f"{'grouping':<26}{'groupby ms':>12}{'kernel ms':>12}"
+          f"{'speedup':>10}")
+    for label, kernel, groupby in cases(sales):
+        pd.testing.assert_series_equal(kernel(), groupby(),
+                                       check_dtype=False, check_names=False,
+                                       check_index_type=False, rtol=1e-12)
+        old = best_ms(groupby, args.repeat)
+        new = best_ms(kernel, args.repeat)
+        print(f"{label:<26}{old:>12.3f}{new:>12.3f}{old / new:>9.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+"""
+Benchmark the peak memory of the delivered-sales load path.
+
+Runs ``parse_order_dates``, ``filter_delivered``, ``add_delivery_speed``
+and two ``filter_by_date_range`` calls (the dashboard's current and
+previous period) on the item-level sales of the sample data, optionally
+repeated to get a larger frame.  The same steps are also run the way they
+were written before copy-on-write -- ``copy()`` followed by column
+assignment, a mask copy and then a sort copy -- and the peak memory traced
+by ``tracemalloc`` is reported for both, after checking they give the same
+frame.
+
+Run from the repository root:
+
+    python benchmarks/bench_memory.py [--scale 20]
+"""
+
+import argparse
+import gc
+import os
+import sys
+import tracemalloc
+
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import data_loader as dl  # noqa: E402
+
+PERIODS = (("2023-01-01", "2023-12-31"), ("2022-01-01", "2022-12-31"))
+DATE_COLUMNS = ("order_purchase_timestamp", "order_approved_at",
+                "order_delivered_carrier_date",
+                "order_delivered_customer_date",
+                "order_estimated_delivery_date")
+
+
+def load_sales(data_dir, scale):
+    """Item-level sales joined with orders, repeated *scale* times."""
+    datasets = dl.load_datasets(data_dir, tables=["orders", "order_items"])
+    sales = dl.build_sales_data(datasets["order_items"], datasets["orders"])
+    if scale > 1:
+        sales = pd.concat([sales] * scale, ignore_index=True)
+    return sales
+
+
+def load_path(sales):
+    """The load path as data_loader runs it."""
+    delivered = dl.add_delivery_speed(
+        dl.filter_delivered(dl.parse_order_dates(sales)))
+    return [dl.filter_by_date_range(delivered, start, end)
+            for start, end in PERIODS]
+
+
+def copying_load_path(sales):
+    """The same steps with a defensive copy in each of them."""
+    sales = sales.copy()
+    for col in DATE_COLUMNS:
+        if col in sales.columns:
+            sales[col], _ = dl.parse_timestamps(sales[col])
+    delivered = sales[sales["order_status"] == "delivered"]
+    delivered = delivered.sort_values("order_purchase_timestamp",
+                                      kind="stable")
+    delivered["year"] = delivered["order_purchase_timestamp"].dt.year
+    delivered["month"] = delivered["order_purchase_timestamp"].dt.month
+    delivered = delivered.copy()
+    delivered["delivery_days"] = (
+        delivered["order_delivered_customer_date"]
+        - delivered["order_purchase_timestamp"]
+    ).dt.days
+    return [dl.filter_by_date_range(delivered, start, end)
+            for start, end in PERIODS]
+
+
+def peak_mb(func, sales):
+    """Result of ``func(sales)`` and the peak memory it traced, in MB."""
+    gc.collect()
+    tracemalloc.start()
+    try:
+        result = func(sales)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return result, peak / 2**20
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--data-dir", default="ecommerce_data")
+    parser.add_argument("--scale", type=int, default=20,
+                        help="repeat the sales rows this many times")
+    args = parser.parse_args(argv)
+
+    dl.enable_copy_on_write()
+    sales = load_sales(args.data_dir, args.scale)
+    size = sales.memory_usage(deep=True).sum() / 2**20
+    print(f"{len(sales):,} rows ({size:.1f} MB), pandas {pd.__version__}, "
+          f"copy-on-write {'on' if dl.copy_on_write_enabled() else 'off'}\n")
+
+    copied, copied_mb = peak_mb(copying_load_path, sales)
+    shared, shared_mb = peak_mb(load_path, sales)
+    for old, new in zip(copied, shared):
+        pd.testing.assert_frame_equal(new.reset_index(drop=True),
+                                      old.reset_index(drop=True),
+                                      check_like=True)
+
+    print(f"{'load path':<26}{'peak MB':>10}")
+    print(f"{'copying':<26}{copied_mb:>10.1f}")
+    print(f"{'copy-on-write':<26}{shared_mb:>10.1f}")
+    print(f"\n{copied_mb / shared_mb:.1f}x less peak memory")
+
+
+if __name__ == "__main__":
+    main()
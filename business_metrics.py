@@ -5,169 +5,396 @@ All functions accept filtered pandas DataFrames and return plain
 Python values or DataFrames -- they do not produce plots.
 """
 
+from collections.abc import Mapping
+from dataclasses import dataclass
+from typing import Optional
+
+import numpy as np
 import pandas as pd
 
+import aggregation as agg
+import data_loader as dl
+
+
+# ---------------------------------------------------------------------------
+# Period comparison
+# ---------------------------------------------------------------------------
+
+def relative_change(current, previous):
+    """Fractional change from *previous* to *current*.
+
+    Parameters
+    ----------
+    current : float
+    previous : float
+
+    Returns
+    -------
+    float
+        e.g. -0.025 means -2.5 %; NaN when *previous* is zero.
+    """
+    if previous == 0:
+        return float("nan")
+    return (current - previous) / previous
+
+
+# ---------------------------------------------------------------------------
+# Grain
+# ---------------------------------------------------------------------------
+# Metrics take item-level sales rows (one row per order item, amounts in
+# ``price``) by default.  With ``order_level=True`` they take the order-level
+# fact table from ``data_loader.build_order_facts`` instead (one row per
+# order, amounts in ``revenue``) and skip the per-order reduction.
+
+def _amount_column(order_level):
+    """Name of the column holding sales amounts at the given grain."""
+    return "revenue" if order_level else "price"
+
+
+# ---------------------------------------------------------------------------
+# Leaderboards
+# ---------------------------------------------------------------------------
+
+def rank_descending(totals, top_k=None, other_label=None):
+    """Sort group totals descending, optionally keeping only the top *k*.
+
+    With *top_k*, the k-th largest total is found with ``np.partition``
+    (linear in the number of groups) and only those *k* are sorted, so
+    leaderboards stay cheap with many thousands of groups.  The remaining
+    groups are dropped, or rolled up into one trailing *other_label* row.
+
+    Parameters
+    ----------
+    totals : pd.Series
+        One total per group.
+    top_k : int, optional
+        Number of groups to keep.  None keeps and sorts every group.
+    other_label : str, optional
+        Label of a rollup row for the groups outside the top *k* (e.g.
+        "Other").  None drops them.  No row is added when nothing is left
+        over.
+
+    Returns
+    -------
+    pd.Series
+        Sorted descending (ties keep their original order), with any
+        rollup row last.
+    """
+    if top_k is None:
+        return totals.sort_values(ascending=False, kind="stable")
+    if top_k < 0:
+        raise ValueError(f"top_k must be non-negative, got {top_k}")
+    values = totals.to_numpy()
+    if top_k >= len(values):
+        top = np.arange(len(values))
+    elif top_k == 0:
+        top = np.array([], dtype=np.intp)
+    else:
+        # Partition to find the k-th largest total, then take ties at that
+        # boundary in their original order so the result matches a stable
+        # full sort followed by head(k).
+        kth = -np.partition(-values, top_k - 1)[top_k - 1]
+        above = np.flatnonzero(values > kth)
+        tied = np.flatnonzero(values == kth)[:top_k - len(above)]
+        top = np.concatenate([above, tied])
+    top = top[np.argsort(-values[top], kind="stable")]
+    ranked = totals.iloc[top]
+    if other_label is None or len(top) == len(values):
+        return ranked
+    rest = np.ones(len(values), dtype=bool)
+    rest[top] = False
+    other = pd.Series([values[rest].sum()], index=[other_label])
+    ranked = pd.concat([ranked, other])
+    ranked.index.name = totals.index.name
+    ranked.name = totals.name
+    return ranked
+
 
 # ---------------------------------------------------------------------------
 # Revenue metrics
 # ---------------------------------------------------------------------------
 
-def total_revenue(delivered):
+def total_revenue(delivered, order_level=False):
     """Sum of item prices for delivered orders.
 
     Parameters
     ----------
     delivered : pd.DataFrame
-        Delivered-sales rows (must contain a ``price`` column).
+        Delivered-sales rows (``price`` column) or order facts
+        (``revenue`` column).
+    order_level : bool
+        True when *delivered* is order facts (one row per order, see
+        ``data_loader.build_order_facts``) rather than item-level rows.
 
     Returns
     -------
     float
     """
-    return float(delivered["price"].sum())
+    return float(delivered[_amount_column(order_level)].sum())
 
 
-def revenue_growth(current_period, previous_period):
+def revenue_growth(current_period, previous_period, order_level=False):
     """Percentage revenue change between two periods.
 
     Parameters
     ----------
     current_period : pd.DataFrame
     previous_period : pd.DataFrame
+    order_level : bool
+        True when both periods are order facts.
 
     Returns
     -------
     float
         Fractional change (e.g. -0.025 means -2.5 %).
     """
-    current = total_revenue(current_period)
-    previous = total_revenue(previous_period)
-    if previous == 0:
-        return float("nan")
-    return (current - previous) / previous
+    return relative_change(total_revenue(current_period, order_level),
+                           total_revenue(previous_period, order_level))
 
 
-def monthly_revenue(delivered):
+def monthly_revenue(delivered, order_level=False):
     """Monthly total revenue for a set of delivered-sales rows.
 
     Parameters
     ----------
     delivered : pd.DataFrame
-        Must contain ``year``, ``month``, and ``price`` columns.
+        Must contain ``year``, ``month``, and ``price`` (item level) or
+        ``revenue`` (order level) columns.
+    order_level : bool
+        True when *delivered* is order facts (one row per order, see
+        ``data_loader.build_order_facts``) rather than item-level rows.
 
     Returns
     -------
     pd.DataFrame
         Columns: year, month, revenue.
     """
+    amount = _amount_column(order_level)
     result = (
-        delivered
-        .groupby(["year", "month"])["price"]
-        .sum()
+        agg.group_sum([delivered["year"], delivered["month"]],
+                      delivered[amount])
+        .rename("revenue")
         .reset_index()
-        .rename(columns={"price": "revenue"})
     )
     return result
 
 
-def month_over_month_growth(delivered):
+def month_over_month_growth(delivered, order_level=False):
     """Month-over-month revenue growth rates.
 
     Parameters
     ----------
     delivered : pd.DataFrame
+    order_level : bool
+        True when *delivered* is order facts (one row per order, see
+        ``data_loader.build_order_facts``) rather than item-level rows.
 
     Returns
     -------
     pd.Series
         Indexed by month, values are fractional changes.
     """
-    monthly = delivered.groupby("month")["price"].sum()
+    monthly = delivered.groupby("month")[_amount_column(order_level)].sum()
     return monthly.pct_change()
 
 
-def average_mom_growth(delivered):
+def average_mom_growth(delivered, order_level=False):
     """Average month-over-month growth rate (excludes NaN for first month).
 
     Parameters
     ----------
     delivered : pd.DataFrame
+    order_level : bool
+        True when *delivered* is order facts (one row per order, see
+        ``data_loader.build_order_facts``) rather than item-level rows.
 
     Returns
     -------
     float
     """
-    return float(month_over_month_growth(delivered).mean())
+    return float(month_over_month_growth(delivered, order_level).mean())
 
 
 # ---------------------------------------------------------------------------
 # Order metrics
 # ---------------------------------------------------------------------------
 
-def total_orders(delivered):
+def total_orders(delivered, order_level=False):
     """Count of unique orders.
 
     Parameters
     ----------
     delivered : pd.DataFrame
+    order_level : bool
+        True when *delivered* is order facts (one row per order, see
+        ``data_loader.build_order_facts``) rather than item-level rows.
 
     Returns
     -------
     int
     """
+    if order_level:
+        return len(delivered)
     return int(delivered["order_id"].nunique())
 
 
-def order_count_growth(current_period, previous_period):
+def order_count_growth(current_period, previous_period, order_level=False):
     """Percentage change in order count between two periods.
 
     Parameters
     ----------
     current_period : pd.DataFrame
     previous_period : pd.DataFrame
+    order_level : bool
+        True when both periods are order facts.
 
     Returns
     -------
     float
     """
-    current = total_orders(current_period)
-    previous = total_orders(previous_period)
-    if previous == 0:
-        return float("nan")
-    return (current - previous) / previous
+    return relative_change(total_orders(current_period, order_level),
+                           total_orders(previous_period, order_level))
 
 
-def average_order_value(delivered):
+def average_order_value(delivered, order_level=False):
     """Average revenue per order (sum of item prices grouped by order_id).
 
     Parameters
     ----------
     delivered : pd.DataFrame
+    order_level : bool
+        True when *delivered* is order facts (one row per order, see
+        ``data_loader.build_order_facts``) rather than item-level rows.
 
     Returns
     -------
     float
     """
+    if order_level:
+        return float(delivered["revenue"].mean())
     return float(delivered.groupby("order_id")["price"].sum().mean())
 
 
-def aov_growth(current_period, previous_period):
+def aov_growth(current_period, previous_period, order_level=False):
     """Percentage change in average order value between two periods.
 
     Parameters
     ----------
     current_period : pd.DataFrame
     previous_period : pd.DataFrame
+    order_level : bool
+        True when both periods are order facts.
 
     Returns
     -------
     float
     """
-    current = average_order_value(current_period)
-    previous = average_order_value(previous_period)
-    if previous == 0:
-        return float("nan")
-    return (current - previous) / previous
+    return relative_change(average_order_value(current_period, order_level),
+                           average_order_value(previous_period, order_level))
+
+
+# ---------------------------------------------------------------------------
+# Fused headline KPIs
+# ---------------------------------------------------------------------------
+
+@dataclass(frozen=True)
+class Kpis:
+    """Headline KPIs of one period, optionally paired with a comparison period.
+
+    The ``*_growth`` properties compare against ``previous`` and are NaN
+    when no previous period was given.
+    """
+
+    revenue: float
+    orders: int
+    average_order_value: float
+    average_mom_growth: float
+    previous: Optional["Kpis"] = None
+
+    def _growth(self, field):
+        if self.previous is None:
+            return float("nan")
+        return relative_change(getattr(self, field),
+                               getattr(self.previous, field))
+
+    @property
+    def revenue_growth(self):
+        """Same as ``revenue_growth(current, previous)``."""
+        return self._growth("revenue")
+
+    @property
+    def order_count_growth(self):
+        """Same as ``order_count_growth(current, previous)``."""
+        return self._growth("orders")
+
+    @property
+    def aov_growth(self):
+        """Same as ``aov_growth(current, previous)``."""
+        return self._growth("average_order_value")
+
+
+def _period_kpis(delivered, order_level):
+    """Reduce one period to per-order revenue once and derive every KPI."""
+    if order_level:
+        per_order = delivered["revenue"].to_numpy(dtype="float64")
+        order_month = delivered["month"].to_numpy(dtype=np.int64)
+    else:
+        codes, order_ids = pd.factorize(delivered["order_id"])
+        per_order = np.bincount(codes, weights=delivered["price"].to_numpy(),
+                                minlength=len(order_ids))
+        # An order's items share one purchase month, so any item's month is
+        # the order's month.
+        order_month = np.zeros(len(order_ids), dtype=np.int64)
+        order_month[codes] = delivered["month"].to_numpy()
+    monthly = np.bincount(order_month, weights=per_order, minlength=13)
+    has_orders = np.bincount(order_month, minlength=13) > 0
+    mom = pd.Series(monthly[has_orders]).pct_change().mean()
+
+    revenue = float(per_order.sum())
+    n_orders = len(per_order)
+    return Kpis(
+        revenue=revenue,
+        orders=n_orders,
+        average_order_value=revenue / n_orders if n_orders else float("nan"),
+        average_mom_growth=float(mom),
+    )
+
+
+def compute_kpis(delivered, previous=None, order_level=False):
+    """Compute all headline KPIs from a single order-level reduction.
+
+    Equivalent to calling ``total_revenue``, ``total_orders``,
+    ``average_order_value`` and ``average_mom_growth`` (plus the matching
+    ``*_growth`` functions when *previous* is given), but each period is
+    grouped by ``order_id`` only once instead of once per metric.
+
+    Parameters
+    ----------
+    delivered : pd.DataFrame
+        Delivered-sales rows of the period of interest (``order_id``,
+        ``price``, ``month``), or order facts (``revenue``, ``month``),
+        which skip the reduction altogether.
+    previous : pd.DataFrame, optional
+        Delivered-sales rows of the comparison period.
+    order_level : bool
+        True when *delivered* (and *previous*) are order facts.
+
+    Returns
+    -------
+    Kpis
+        KPIs of *delivered*, with ``previous`` set when a comparison period
+        was given.
+    """
+    current = _period_kpis(delivered, order_level)
+    if previous is None:
+        return current
+    return Kpis(
+        revenue=current.revenue,
+        orders=current.orders,
+        average_order_value=current.average_order_value,
+        average_mom_growth=current.average_mom_growth,
+        previous=_period_kpis(previous, order_level),
+    )
 
 
 # ---------------------------------------------------------------------------
@@ -188,44 +415,59 @@ def order_status_distribution(orders, year):
     pd.Series
         Index: order_status, values: proportions.
     """
-    orders = orders.copy()
-    if not pd.api.types.is_datetime64_any_dtype(orders["order_purchase_timestamp"]):
-        orders["order_purchase_timestamp"] = pd.to_datetime(
-            orders["order_purchase_timestamp"], errors="coerce"
-        )
-    mask = orders["order_purchase_timestamp"].dt.year == year
-    return orders.loc[mask, "order_status"].value_counts(normalize=True)
+    purchased, _ = dl.parse_timestamps(orders["order_purchase_timestamp"])
+    mask = purchased.dt.year == year
+    shares = orders.loc[mask, "order_status"].value_counts(normalize=True)
+    # Categorical statuses report every category; keep only observed ones.
+    return shares[shares > 0]
 
 
 # ---------------------------------------------------------------------------
 # Product / category metrics
 # ---------------------------------------------------------------------------
 
-def revenue_by_category(delivered, products):
+def revenue_by_category(delivered, products=None, top_k=None,
+                        other_label=None):
     """Total revenue per product category.
 
+    Enriched sales data (see ``data_loader.enrich_sales``) is grouped
+    directly; otherwise *products* is joined in first.
+
     Parameters
     ----------
     delivered : pd.DataFrame
-        Must contain ``product_id`` and ``price``.
-    products : pd.DataFrame
+        Must contain ``price`` and either ``product_category_name`` or
+        ``product_id``.
+    products : pd.DataFrame, optional
         Must contain ``product_id`` and ``product_category_name``.
+        Required unless *delivered* already has ``product_category_name``.
+    top_k : int, optional
+        Keep only the *top_k* categories (see ``rank_descending``).
+    other_label : str, optional
+        Label of a rollup row for the remaining categories; None drops
+        them.  Only used with *top_k*.
 
     Returns
     -------
     pd.Series
         Indexed by product_category_name, sorted descending.
     """
-    merged = pd.merge(
-        products[["product_id", "product_category_name"]],
-        delivered[["product_id", "price"]],
-        on="product_id",
-    )
-    return (
-        merged
-        .groupby("product_category_name")["price"]
-        .sum()
-        .sort_values(ascending=False)
+    if "product_category_name" in delivered.columns:
+        merged = delivered
+    elif products is None:
+        raise ValueError(
+            "products is required unless delivered has a "
+            "product_category_name column"
+        )
+    else:
+        merged = pd.merge(
+            products[["product_id", "product_category_name"]],
+            delivered[["product_id", "price"]],
+            on="product_id",
+        )
+    return rank_descending(
+        agg.group_sum(merged["product_category_name"], merged["price"]),
+        top_k, other_label,
     )
 
 
@@ -233,40 +475,61 @@ def revenue_by_category(delivered, products):
 # Geographic metrics
 # ---------------------------------------------------------------------------
 
-def revenue_by_state(delivered, orders, customers):
+def revenue_by_state(delivered, orders=None, customers=None, top_k=None,
+                     other_label=None, order_level=False):
     """Total revenue per customer state.
 
+    Sales data or order facts that already carry ``customer_state`` are
+    grouped directly; otherwise *orders* and *customers* are joined in.
+
     Parameters
     ----------
     delivered : pd.DataFrame
-        Must contain ``order_id`` and ``price``.
-    orders : pd.DataFrame
+        Must contain ``price`` (or ``revenue`` for order facts) and either
+        ``customer_state`` or ``order_id``.
+    orders : pd.DataFrame, optional
         Must contain ``order_id`` and ``customer_id``.
-    customers : pd.DataFrame
-        Must contain ``customer_id`` and ``customer_state``.
+    customers : pd.DataFrame, optional
+        Must contain ``customer_id`` and ``customer_state``.  *orders* and
+        *customers* are required unless *delivered* has ``customer_state``.
+    top_k : int, optional
+        Keep only the *top_k* states (see ``rank_descending``).
+    other_label : str, optional
+        Label of a rollup row for the remaining states; None drops them.
+        Only used with *top_k*.
+    order_level : bool
+        True when *delivered* is order facts.
 
     Returns
     -------
     pd.DataFrame
         Columns: customer_state, revenue. Sorted descending by revenue.
     """
-    sales_customers = pd.merge(
-        delivered[["order_id", "price"]],
-        orders[["order_id", "customer_id"]],
-        on="order_id",
-    )
-    sales_states = pd.merge(
-        sales_customers,
-        customers[["customer_id", "customer_state"]],
-        on="customer_id",
-    )
+    amount = _amount_column(order_level)
+    if "customer_state" in delivered.columns:
+        sales_states = delivered
+    elif orders is None or customers is None:
+        raise ValueError(
+            "orders and customers are required unless delivered has a "
+            "customer_state column"
+        )
+    else:
+        sales_customers = pd.merge(
+            delivered[["order_id", amount]],
+            orders[["order_id", "customer_id"]],
+            on="order_id",
+        )
+        sales_states = pd.merge(
+            sales_customers,
+            customers[["customer_id", "customer_state"]],
+            on="customer_id",
+        )
+    totals = agg.group_sum(sales_states["customer_state"],
+                           sales_states[amount])
     result = (
-        sales_states
-        .groupby("customer_state")["price"]
-        .sum()
-        .sort_values(ascending=False)
+        rank_descending(totals, top_k, other_label)
+        .rename("revenue")
         .reset_index()
-        .rename(columns={"price": "revenue"})
     )
     return result
 
@@ -275,9 +538,20 @@ def revenue_by_state(delivered, orders, customers):
 # Customer-experience metrics
 # ---------------------------------------------------------------------------
 
+# Bucket schemes: upper bin edges (inclusive) and one label per bin.  The
+# "speed" scheme is the vectorized form of ``categorize_delivery_speed``.
+DELIVERY_BUCKET_SCHEMES = {
+    "speed": ((3, 7), ("1-3 days", "4-7 days", "8+ days")),
+    "week": ((7, 14, 21), ("1 week", "2 weeks", "3 weeks", "3+ weeks")),
+}
+
+
 def categorize_delivery_speed(days):
     """Bin delivery days into human-readable buckets.
 
+    Scalar reference implementation of the "speed" scheme; bulk callers
+    should use ``bucket_delivery_days``.
+
     Parameters
     ----------
     days : int or float
@@ -294,32 +568,118 @@ def categorize_delivery_speed(days):
     return "8+ days"
 
 
-def review_delivery_summary(delivered, reviews):
+def bucket_delivery_days(days, edges=None, labels=None, missing_label=None):
+    """Vectorized binning of delivery days into an ordered categorical.
+
+    Bins are closed on the right: with edges (3, 7) a value falls in bin 0
+    if ``days <= 3``, bin 1 if ``3 < days <= 7`` and bin 2 otherwise --
+    the same rule as ``categorize_delivery_speed``.
+
+    Parameters
+    ----------
+    days : pd.Series
+        Delivery days; may contain NaN.
+    edges : sequence of float, optional
+        Increasing inclusive upper edges.  Defaults to the "speed" scheme.
+    labels : sequence of str, optional
+        One label per bin (``len(edges) + 1``).
+    missing_label : str, optional
+        Bucket for NaN delivery days (appended as the last category).  By
+        default NaN days stay NaN rather than landing in the slowest bucket.
+
+    Returns
+    -------
+    pd.Series
+        Ordered categorical aligned with *days*.
+    """
+    if edges is None and labels is None:
+        edges, labels = DELIVERY_BUCKET_SCHEMES["speed"]
+    edges = np.asarray(edges, dtype="float64")
+    labels = list(labels)
+    if len(labels) != len(edges) + 1:
+        raise ValueError(
+            f"need {len(edges) + 1} labels for {len(edges)} edges, "
+            f"got {len(labels)}"
+        )
+    if np.any(np.diff(edges) <= 0):
+        raise ValueError("bucket edges must be strictly increasing")
+
+    values = days.to_numpy(dtype="float64", na_value=np.nan)
+    codes = np.searchsorted(edges, values, side="left")
+    missing = np.isnan(values)
+    if missing_label is None:
+        codes[missing] = -1
+    else:
+        codes[missing] = len(labels)
+        labels.append(missing_label)
+    buckets = pd.Categorical.from_codes(codes, categories=labels, ordered=True)
+    return pd.Series(buckets, index=days.index, name=days.name)
+
+
+def bucket_delivery_schemes(days, schemes=None, missing_label=None):
+    """Apply several bucket schemes to the same delivery days at once.
+
+    Parameters
+    ----------
+    days : pd.Series
+    schemes : Mapping[str, tuple] or iterable of str, optional
+        Scheme name to ``(edges, labels)``, or names looked up in
+        ``DELIVERY_BUCKET_SCHEMES``.  Defaults to every registered scheme.
+    missing_label : str, optional
+        Passed to ``bucket_delivery_days``.
+
+    Returns
+    -------
+    pd.DataFrame
+        One ordered categorical column per scheme, aligned with *days*.
+    """
+    if schemes is None:
+        schemes = DELIVERY_BUCKET_SCHEMES
+    elif not isinstance(schemes, Mapping):
+        schemes = {name: DELIVERY_BUCKET_SCHEMES[name] for name in schemes}
+    return pd.DataFrame({
+        name: bucket_delivery_days(days, edges, labels, missing_label)
+        for name, (edges, labels) in schemes.items()
+    }, index=days.index)
+
+
+def review_delivery_summary(delivered, reviews=None):
     """Build a per-order summary with delivery days, review score, and bucket.
 
+    Frames that already carry ``review_score`` (e.g. sales rows merged with
+    ``data_loader.distinct_reviews``) are summarized directly; others (item
+    rows or order facts) are merged with *reviews*.  Either way the result
+    has one row per distinct (order, review score).
+
     Parameters
     ----------
     delivered : pd.DataFrame
         Must contain ``order_id``, ``delivery_days``.
-    reviews : pd.DataFrame
-        Must contain ``order_id``, ``review_score``.
+    reviews : pd.DataFrame, optional
+        Must contain ``order_id``, ``review_score``.  Required unless
+        *delivered* has a ``review_score`` column.
 
     Returns
     -------
     pd.DataFrame
         Unique order-level rows with columns: order_id, delivery_days,
-        review_score, delivery_bucket.
+        review_score, delivery_bucket (ordered categorical; NaN when the
+        delivery date is unknown).
     """
-    merged = delivered.merge(reviews[["order_id", "review_score"]], on="order_id")
-    summary = (
-        merged[["order_id", "delivery_days", "review_score"]]
-        .drop_duplicates()
-    )
-    summary = summary.copy()
-    summary["delivery_bucket"] = summary["delivery_days"].apply(
-        categorize_delivery_speed
+    columns = ["order_id", "delivery_days", "review_score"]
+    if "review_score" in delivered.columns:
+        summary = delivered.loc[delivered["review_score"].notna(), columns]
+    elif reviews is None:
+        raise ValueError(
+            "reviews is required unless delivered has a review_score column"
+        )
+    else:
+        summary = delivered.merge(dl.distinct_reviews(reviews),
+                                  on="order_id")[columns]
+    summary = summary.drop_duplicates()
+    return summary.assign(
+        delivery_bucket=bucket_delivery_days(summary["delivery_days"])
     )
-    return summary
 
 
 def avg_review_by_delivery_bucket(review_summary):
@@ -333,14 +693,14 @@ def avg_review_by_delivery_bucket(review_summary):
     Returns
     -------
     pd.DataFrame
-        Columns: delivery_bucket, avg_review_score.
+        Columns: delivery_bucket, avg_review_score.  Buckets appear in
+        their natural (fastest first) order.
     """
     return (
-        review_summary
-        .groupby("delivery_bucket")["review_score"]
-        .mean()
+        agg.group_mean(review_summary["delivery_bucket"],
+                       review_summary["review_score"])
+        .rename("avg_review_score")
         .reset_index()
-        .rename(columns={"review_score": "avg_review_score"})
     )
 
 
@@ -357,11 +717,10 @@ def avg_review_by_delivery_day(review_summary):
         Columns: delivery_days, avg_review_score.
     """
     return (
-        review_summary
-        .groupby("delivery_days")["review_score"]
-        .mean()
+        agg.group_mean(review_summary["delivery_days"],
+                       review_summary["review_score"])
+        .rename("avg_review_score")
         .reset_index()
-        .rename(columns={"review_score": "avg_review_score"})
     )
 
 
@@ -406,3 +765,285 @@ def average_review_score(review_summary):
     float
     """
     return float(review_summary["review_score"].mean())
+
+
+# ---------------------------------------------------------------------------
+# Cube-backed metrics
+# ---------------------------------------------------------------------------
+# These mirror the row-level metrics above but take cells of the daily cube
+# (``data_loader.filter_cube`` over ``data_loader.build_daily_cube``), so
+# their cost depends on the number of days in range, not orders.
+
+def cube_total_revenue(cube_cells):
+    """Sum of item prices; cube version of ``total_revenue``.
+
+    Parameters
+    ----------
+    cube_cells : pd.DataFrame
+        Output of ``data_loader.filter_cube``.
+
+    Returns
+    -------
+    float
+    """
+    return float(cube_cells["revenue"].sum())
+
+
+def cube_total_orders(cube_cells):
+    """Count of orders; cube version of ``total_orders``.
+
+    Parameters
+    ----------
+    cube_cells : pd.DataFrame
+
+    Returns
+    -------
+    int
+    """
+    return int(cube_cells["orders"].sum())
+
+
+def cube_average_order_value(cube_cells):
+    """Revenue per order; cube version of ``average_order_value``.
+
+    Parameters
+    ----------
+    cube_cells : pd.DataFrame
+
+    Returns
+    -------
+    float
+        NaN when there are no orders.
+    """
+    orders = cube_total_orders(cube_cells)
+    if orders == 0:
+        return float("nan")
+    return cube_total_revenue(cube_cells) / orders
+
+
+def cube_monthly_revenue(cube_cells):
+    """Monthly total revenue; cube version of ``monthly_revenue``.
+
+    Parameters
+    ----------
+    cube_cells : pd.DataFrame
+
+    Returns
+    -------
+    pd.DataFrame
+        Columns: year, month, revenue.
+    """
+    days = cube_cells["day"].dt
+    return (
+        cube_cells["revenue"]
+        .groupby([days.year.rename("year"), days.month.rename("month")])
+        .sum()
+        .reset_index()
+    )
+
+
+def cube_average_mom_growth(cube_cells):
+    """Average month-over-month growth; cube version of ``average_mom_growth``.
+
+    Like the row-level version, months are grouped by calendar month only.
+
+    Parameters
+    ----------
+    cube_cells : pd.DataFrame
+
+    Returns
+    -------
+    float
+    """
+    monthly = (
+        cube_cells["revenue"]
+        .groupby(cube_cells["day"].dt.month.rename("month"))
+        .sum()
+    )
+    return float(monthly.pct_change().mean())
+
+
+def cube_revenue_by_category(cube_cells, top_k=None, other_label=None):
+    """Revenue per product category; cube version of ``revenue_by_category``.
+
+    Parameters
+    ----------
+    cube_cells : pd.DataFrame
+    top_k : int, optional
+    other_label : str, optional
+        As for ``revenue_by_category``.
+
+    Returns
+    -------
+    pd.Series
+        Indexed by product_category_name, sorted descending.
+    """
+    totals = (
+        cube_cells
+        .groupby("product_category_name", observed=True)["revenue"]
+        .sum()
+    )
+    return rank_descending(totals, top_k, other_label)
+
+
+def cube_revenue_by_state(cube_cells, top_k=None, other_label=None):
+    """Revenue per customer state; cube version of ``revenue_by_state``.
+
+    Parameters
+    ----------
+    cube_cells : pd.DataFrame
+    top_k : int, optional
+    other_label : str, optional
+        As for ``revenue_by_state``.
+
+    Returns
+    -------
+    pd.DataFrame
+        Columns: customer_state, revenue. Sorted descending by revenue.
+    """
+    totals = (
+        cube_cells
+        .groupby("customer_state", observed=True)["revenue"]
+        .sum()
+    )
+    return rank_descending(totals, top_k, other_label).reset_index()
+
+
+def cube_average_delivery_days(cube_cells):
+    """Mean delivery time of reviewed orders; cube ``average_delivery_days``.
+
+    Parameters
+    ----------
+    cube_cells : pd.DataFrame
+
+    Returns
+    -------
+    float
+        NaN when no reviewed order has a delivery date.
+    """
+    count = cube_cells["delivery_days_count"].sum()
+    if count == 0:
+        return float("nan")
+    return float(cube_cells["delivery_days_sum"].sum() / count)
+
+
+def cube_average_review_score(cube_cells):
+    """Mean review score; cube version of ``average_review_score``.
+
+    Parameters
+    ----------
+    cube_cells : pd.DataFrame
+
+    Returns
+    -------
+    float
+        NaN when there are no reviews.
+    """
+    count = cube_review_count(cube_cells)
+    if count == 0:
+        return float("nan")
+    return float(cube_cells["review_score_sum"].sum() / count)
+
+
+def cube_review_count(cube_cells):
+    """Number of reviews (rows ``review_delivery_summary`` would return).
+
+    Parameters
+    ----------
+    cube_cells : pd.DataFrame
+
+    Returns
+    -------
+    int
+    """
+    return int(cube_cells["review_count"].sum())
+
+
+def summarize_totals(totals):
+    """Headline KPIs from additive range totals.
+
+    Parameters
+    ----------
+    totals : Mapping[str, float]
+        Sums of the cube measures over a range, e.g. from
+        ``data_loader.PrefixSums.totals``.
+
+    Returns
+    -------
+    dict[str, float]
+        revenue, orders, average_order_value, average_delivery_days,
+        average_review_score and review_count.  Ratios are NaN when their
+        denominator is zero.
+    """
+    def ratio(numerator, denominator):
+        if denominator == 0:
+            return float("nan")
+        return numerator / denominator
+
+    return {
+        "revenue": totals["revenue"],
+        "orders": int(totals["orders"]),
+        "average_order_value": ratio(totals["revenue"], totals["orders"]),
+        "average_delivery_days": ratio(totals["delivery_days_sum"],
+                                       totals["delivery_days_count"]),
+        "average_review_score": ratio(totals["review_score_sum"],
+                                      totals["review_count"]),
+        "review_count": int(totals["review_count"]),
+    }
+
+
+# ---------------------------------------------------------------------------
+# Column requirements
+# ---------------------------------------------------------------------------
+# Item-level sales columns (see ``data_loader.SALES_LINEAGE``) each metric
+# reads, including columns it only sees through ``review_delivery_summary``.
+# ``data_loader.source_columns`` turns a union of these into the table
+# columns to load, so a caller reads nothing its metrics do not use.
+
+_REVIEW_COLUMNS = ("order_id", "delivery_days", "review_score")
+_MONTHLY_COLUMNS = ("year", "month", "price")
+
+REQUIRED_COLUMNS = {
+    "total_revenue": ("price",),
+    "revenue_growth": ("price",),
+    "monthly_revenue": _MONTHLY_COLUMNS,
+    "month_over_month_growth": _MONTHLY_COLUMNS,
+    "average_mom_growth": _MONTHLY_COLUMNS,
+    "total_orders": ("order_id",),
+    "order_count_growth": ("order_id",),
+    "average_order_value": ("order_id", "price"),
+    "aov_growth": ("order_id", "price"),
+    "compute_kpis": ("order_id", "price", "month"),
+    "order_status_distribution": ("order_status", "order_purchase_timestamp"),
+    "revenue_by_category": ("product_category_name", "price"),
+    "revenue_by_state": ("customer_state", "price"),
+    "review_delivery_summary": _REVIEW_COLUMNS,
+    "avg_review_by_delivery_bucket": _REVIEW_COLUMNS,
+    "avg_review_by_delivery_day": _REVIEW_COLUMNS,
+    "review_score_distribution": _REVIEW_COLUMNS,
+    "average_delivery_days": _REVIEW_COLUMNS,
+    "average_review_score": _REVIEW_COLUMNS,
+}
+
+
+def required_columns(*metrics):
+    """Union of the sales columns the named metrics read.
+
+    Parameters
+    ----------
+    *metrics : str
+        Keys of ``REQUIRED_COLUMNS`` (metric function names).
+
+    Returns
+    -------
+    list of str
+        In first-seen order.
+    """
+    columns = []
+    for metric in metrics:
+        try:
+            needed = REQUIRED_COLUMNS[metric]
+        except KeyError:
+            raise ValueError(f"no column requirements for {metric!r}") from None
+        columns.extend(col for col in needed if col not in columns)
+    return columns
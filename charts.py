@@ -0,0 +1,146 @@
+"""
+Figure builders that run outside the Streamlit script.
+
+Building a figure is pure Python and holds the GIL, so a thread pool cannot
+overlap the heavy ones with the rest of a rerun.  The builders here live in
+an importable module (not ``app.py``, which Streamlit executes as a script)
+so the dashboard can run them in worker processes started by
+``start_pool``.  They take plain DataFrames and return the figure's spec
+(``fig.to_dict()``), which pickles far faster than a ``plotly`` figure.
+"""
+
+import multiprocessing
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+import plotly.express as px
+import plotly.graph_objects as go
+import plotly.io as pio
+
+
+# ---------------------------------------------------------------------------
+# Worker set-up
+# ---------------------------------------------------------------------------
+
+def use_template(template):
+    """Make *template* the default for figures built in this process.
+
+    A worker process starts with plotly's own default template, not the
+    one the dashboard process uses (Streamlit installs its theme), so the
+    pool passes that template in as its initializer.
+
+    Parameters
+    ----------
+    template : dict
+        Template spec, e.g. ``pio.templates[name].to_plotly_json()``.
+    """
+    pio.templates["dashboard"] = go.layout.Template(template)
+    pio.templates.default = "dashboard"
+
+
+def _start_worker(template, started):
+    """Pool initializer: set the template, then wait for the other workers."""
+    use_template(template)
+    started.wait(timeout=60)
+
+
+def start_pool(max_workers, template):
+    """Start a process pool for the builders below, all workers at once.
+
+    Workers are spawned (forking a threaded server is unsafe).  A spawned
+    process re-imports its parent's ``__main__`` first, and under Streamlit
+    that is the dashboard script, so the workers are started here with this
+    module standing in as ``__main__``: they import ``charts`` only.  Every
+    worker is started before this returns (each waits in its initializer
+    until all have started), so the pool never spawns one later, and each
+    builds an empty map so the first real build does not pay for importing
+    plotly.
+
+    Parameters
+    ----------
+    max_workers : int
+    template : dict
+        Plotly template for the workers (see ``use_template``).
+
+    Returns
+    -------
+    concurrent.futures.ProcessPoolExecutor
+    """
+    context = multiprocessing.get_context("spawn")
+    started = context.Barrier(max_workers)
+    pool = ProcessPoolExecutor(max_workers=max_workers, mp_context=context,
+                               initializer=_start_worker,
+                               initargs=(template, started))
+    empty = pd.DataFrame({"customer_state": [], "revenue": []})
+    main = sys.modules["__main__"]
+    sys.modules["__main__"] = sys.modules[__name__]
+    try:
+        # No worker is idle before all have started, so each submit
+        # starts one.
+        for _ in range(max_workers):
+            pool.submit(state_revenue_map, empty)
+    finally:
+        sys.modules["__main__"] = main
+    return pool
+
+
+# ---------------------------------------------------------------------------
+# Revenue by state
+# ---------------------------------------------------------------------------
+
+def state_revenue_map(state_revenue):
+    """US choropleth of revenue per state, with state labels.
+
+    Parameters
+    ----------
+    state_revenue : pd.DataFrame
+        ``customer_state`` and ``revenue`` columns, as returned by
+        ``business_metrics.cube_revenue_by_state``.
+
+    Returns
+    -------
+    dict
+        Figure spec; ``go.Figure(spec)`` rebuilds the figure.
+    """
+    fig_map = px.choropleth(
+        state_revenue,
+        locations="customer_state",
+        color="revenue",
+        locationmode="USA-states",
+        scope="usa",
+        color_continuous_scale=[
+            [0, "#d4e8f0"],
+            [0.35, "#6dafc9"],
+            [0.7, "#2C6E91"],
+            [1, "#123a50"],
+        ],
+        labels={"revenue": "Revenue", "customer_state": "State"},
+    )
+    # Add state abbreviation labels on the map
+    fig_map.add_trace(go.Scattergeo(
+        locations=state_revenue["customer_state"],
+        locationmode="USA-states",
+        text=state_revenue["customer_state"],
+        mode="text",
+        textfont=dict(size=9, color="#1e293b", family="Inter, sans-serif"),
+        showlegend=False,
+        hoverinfo="skip",
+    ))
+
+    fig_map.update_layout(
+        title="Revenue by State",
+        geo=dict(
+            lakecolor="white",
+            bgcolor="white",
+        ),
+        plot_bgcolor="white",
+        paper_bgcolor="white",
+        margin=dict(l=0, r=0, t=50, b=0),
+        height=380,
+        coloraxis_colorbar=dict(
+            tickprefix="$",
+            tickformat=".2s",
+        ),
+    )
+    return fig_map.to_dict()
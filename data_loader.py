@@ -5,38 +5,1004 @@ Provides functions to load CSV datasets, parse datetime columns,
 merge order-level data, and filter by configurable date ranges.
 """
 
+import datetime
+import hashlib
+import importlib.util
+import io
+import json
+import os
+import shutil
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from types import MappingProxyType
+
+import numpy as np
 import pandas as pd
 
 
+# ---------------------------------------------------------------------------
+# Dataset files
+# ---------------------------------------------------------------------------
+
+DATASET_FILES = {
+    "orders": "orders_dataset.csv",
+    "order_items": "order_items_dataset.csv",
+    "products": "products_dataset.csv",
+    "customers": "customers_dataset.csv",
+    "reviews": "order_reviews_dataset.csv",
+    "payments": "order_payments_dataset.csv",
+}
+
+_HAS_PYARROW = importlib.util.find_spec("pyarrow") is not None
+
+
+def data_version(data_dir="ecommerce_data"):
+    """Short token that changes whenever any dataset file changes.
+
+    Built from each CSV's size and mtime only, so it is cheap enough to
+    compute on every dashboard rerun and use as a cache key.
+
+    Parameters
+    ----------
+    data_dir : str
+
+    Returns
+    -------
+    str
+    """
+    digest = hashlib.sha256()
+    for filename in DATASET_FILES.values():
+        stat = os.stat(os.path.join(data_dir, filename))
+        digest.update(f"{filename}:{stat.st_size}:{stat.st_mtime_ns};".encode())
+    return digest.hexdigest()[:16]
+
+# ---------------------------------------------------------------------------
+# Schemas
+# ---------------------------------------------------------------------------
+
+TIMESTAMP_FORMAT = "%Y-%m-%d %H:%M:%S.%f"
+
+# Arrow-backed strings keep the prefixed hex IDs in one contiguous buffer
+# instead of one Python object per value.
+_ID = "string[pyarrow]" if _HAS_PYARROW else "object"
+_DATETIME = "datetime64[ns]"
+
+# Declared dtypes per table.  Low-cardinality strings become categoricals,
+# small counters are narrowed, and datetime columns are parsed with
+# TIMESTAMP_FORMAT.  Money columns stay float64 so revenue sums do not lose
+# cents, and columns not listed here (free text) are left to pandas.
+SCHEMAS = {
+    "orders": {
+        "order_id": _ID,
+        "customer_id": _ID,
+        "order_status": "category",
+        "order_purchase_timestamp": _DATETIME,
+        "order_approved_at": _DATETIME,
+        "order_delivered_carrier_date": _DATETIME,
+        "order_delivered_customer_date": _DATETIME,
+        "order_estimated_delivery_date": _DATETIME,
+    },
+    "order_items": {
+        "order_id": _ID,
+        "order_item_id": "int32",
+        "product_id": _ID,
+        "seller_id": _ID,
+        "shipping_limit_date": _DATETIME,
+        "price": "float64",
+        "freight_value": "float64",
+    },
+    "products": {
+        "product_id": _ID,
+        "product_category_name": "category",
+        "product_name_length": "float32",
+        "product_description_length": "float32",
+        "product_photos_qty": "float32",
+        "product_weight_g": "float32",
+        "product_length_cm": "float32",
+        "product_height_cm": "float32",
+        "product_width_cm": "float32",
+    },
+    "customers": {
+        "customer_id": _ID,
+        "customer_unique_id": _ID,
+        "customer_zip_code_prefix": "int32",
+        "customer_city": "category",
+        "customer_state": "category",
+    },
+    "reviews": {
+        "review_id": _ID,
+        "order_id": _ID,
+        "review_score": "int8",
+        "review_comment_title": "category",
+        "review_creation_date": _DATETIME,
+        "review_answer_timestamp": _DATETIME,
+    },
+    "payments": {
+        "order_id": _ID,
+        "payment_sequential": "int32",
+        "payment_type": "category",
+        "payment_installments": "int32",
+        "payment_value": "float64",
+    },
+}
+
+
+def parse_timestamps(values, fmt=TIMESTAMP_FORMAT):
+    """Parse a column of timestamp strings laid out as *fmt*.
+
+    This is the single parsing path for every timestamp column.  The fixed
+    format is parsed in one vectorized pass; only the rows it rejects (e.g.
+    a missing fractional second or a bare date) are retried, in a second
+    pass that infers the layout of each value (``format="mixed"``).  Columns that are already datetime64 are
+    returned untouched, so calling this twice never parses twice.
+
+    Parameters
+    ----------
+    values : pd.Series
+        Timestamp strings (or an already-parsed datetime column).
+    fmt : str
+        strftime-style layout of the well-formed rows.
+
+    Returns
+    -------
+    pd.Series
+        datetime64 column; unparseable values become NaT.
+    int
+        Number of non-missing values that could not be parsed at all and
+        were coerced to NaT.
+    """
+    if pd.api.types.is_datetime64_any_dtype(values):
+        return values, 0
+    parsed = pd.to_datetime(values, format=fmt, errors="coerce")
+    present = values.notna()
+    irregular = parsed.isna() & present
+    if irregular.any():
+        retried = pd.to_datetime(values[irregular], format="mixed",
+                                 errors="coerce")
+        # The passes may infer different units; keep the finer one.
+        dtype = np.result_type(parsed.dtype, retried.dtype)
+        parsed = parsed.astype(dtype)
+        parsed[irregular] = retried.astype(dtype)
+    n_coerced = int((parsed.isna() & present).sum())
+    return parsed, n_coerced
+
+
+def _read_table(csv_path, name, typed=True, columns=None):
+    """Read one CSV, applying its declared schema unless *typed* is False.
+
+    Non-datetime dtypes are handed to the CSV parser directly; datetime
+    columns are read as strings and converted with ``parse_timestamps``.
+    With *columns*, only those columns are parsed (``usecols``), in that
+    order.
+
+    Returns
+    -------
+    tuple[pd.DataFrame, dict[str, int]]
+        The table and, per parsed datetime column, the number of values
+        coerced to NaT.
+    """
+    usecols = None if columns is None else list(columns)
+    if not typed:
+        frame = pd.read_csv(csv_path, usecols=usecols)
+        return (frame if usecols is None else frame[usecols]), {}
+    dtypes, date_cols = _csv_schema(name, usecols)
+    frame = pd.read_csv(csv_path, dtype=dtypes, usecols=usecols)
+    return _finish_frame(frame, usecols, date_cols)
+
+
+def _csv_schema(name, usecols=None):
+    """Parser dtypes and datetime columns of a table, optionally projected."""
+    schema = SCHEMAS.get(name, {})
+    if usecols is not None:
+        schema = {col: schema[col] for col in usecols if col in schema}
+    date_cols = [col for col, dtype in schema.items() if dtype == _DATETIME]
+    dtypes = {col: dtype for col, dtype in schema.items() if dtype != _DATETIME}
+    return dtypes, date_cols
+
+
+def _finish_frame(frame, usecols, date_cols):
+    """Project columns and parse datetimes; returns (frame, coerced)."""
+    if usecols is not None:
+        frame = frame[usecols]
+    coerced = {}
+    for col in date_cols:
+        if col in frame.columns:
+            frame[col], coerced[col] = parse_timestamps(frame[col])
+    return frame, coerced
+
+
+def memory_report(data_dir="ecommerce_data"):
+    """Compare in-memory size of each table with and without SCHEMAS.
+
+    Every CSV is read twice -- once with pandas' inferred dtypes and once
+    with the declared schema -- so this is a diagnostic, not a load path.
+
+    Parameters
+    ----------
+    data_dir : str
+        Path to the directory containing the CSV files.
+
+    Returns
+    -------
+    pd.DataFrame
+        Columns: table, inferred_bytes, typed_bytes, reduction (fraction of
+        inferred_bytes saved).  Includes a final "total" row.
+    """
+    rows = []
+    for name, filename in DATASET_FILES.items():
+        csv_path = os.path.join(data_dir, filename)
+        inferred, _ = _read_table(csv_path, name, typed=False)
+        typed, _ = _read_table(csv_path, name)
+        rows.append({
+            "table": name,
+            "inferred_bytes": int(inferred.memory_usage(deep=True).sum()),
+            "typed_bytes": int(typed.memory_usage(deep=True).sum()),
+        })
+    report = pd.DataFrame(rows)
+    total = report[["inferred_bytes", "typed_bytes"]].sum()
+    report.loc[len(report)] = ["total", total["inferred_bytes"],
+                               total["typed_bytes"]]
+    report["reduction"] = 1 - report["typed_bytes"] / report["inferred_bytes"]
+    return report
+
+
+# ---------------------------------------------------------------------------
+# Snapshots
+# ---------------------------------------------------------------------------
+
+SNAPSHOT_DIR = ".snapshot"
+
+# Bump whenever the snapshot layout or the way tables are read changes, so
+# that stale snapshots written by older code are rebuilt.
+_SNAPSHOT_VERSION = 4
+
+# Bytes at the start of a CSV and just before the high-water mark whose
+# checksums must still match for a grown CSV to count as appended to rather
+# than rewritten.
+_TAIL_BYTES = 1 << 16
+
+
+def _schema_key(name):
+    """Stable string identifying the schema a snapshot was written with."""
+    return json.dumps(SCHEMAS.get(name, {}), sort_keys=True)
+
+
+def _file_signature(path):
+    """Cheap change detector for a file: its size and modification time."""
+    stat = os.stat(path)
+    return {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+
+
+def _file_digest(path, chunk_size=1 << 20):
+    """SHA-256 of a file's contents, read in fixed-size chunks."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as fh:
+        for chunk in iter(lambda: fh.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _tail_digest(path, offset, tail_bytes=_TAIL_BYTES):
+    """SHA-256 of the *tail_bytes* of a file that end at byte *offset*."""
+    start = max(offset - tail_bytes, 0)
+    with open(path, "rb") as fh:
+        fh.seek(start)
+        return hashlib.sha256(fh.read(offset - start)).hexdigest()
+
+
+def _snapshot_paths(data_dir, name):
+    """Return the (parquet, metadata) paths of a table's snapshot."""
+    base = os.path.join(data_dir, SNAPSHOT_DIR, name)
+    return base + ".parquet", base + ".json"
+
+
+def _write_json(path, payload):
+    """Atomically replace *path* with a JSON document."""
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w") as fh:
+        json.dump(payload, fh)
+    os.replace(tmp_path, path)
+
+
+def _read_snapshot(csv_path, snapshot_path, meta_path, schema_key,
+                   columns=None):
+    """Return the snapshot of *csv_path* if it is still valid, else None.
+
+    A valid snapshot is returned as ``(frame, coerced)``, where *coerced* is
+    the timestamp coercion count recorded when the CSV was parsed.  With
+    *columns*, only those columns are read from the (columnar) snapshot.
+
+    Size and mtime are checked first.  If only the mtime moved (e.g. the file
+    was touched or re-copied) the content hash decides, and a match refreshes
+    the stored signature so the next start takes the cheap path again.
+    A snapshot that cannot be read (truncated or corrupt) counts as invalid,
+    so the caller rebuilds it from the CSV.
+    """
+    try:
+        with open(meta_path) as fh:
+            meta = json.load(fh)
+    except (OSError, ValueError):
+        return None
+    if meta.get("version") != _SNAPSHOT_VERSION:
+        return None
+    if meta.get("schema") != schema_key:
+        return None
+    if not os.path.exists(snapshot_path):
+        return None
+
+    signature = _file_signature(csv_path)
+    if signature["size"] != meta.get("size"):
+        return None
+    if signature["mtime_ns"] != meta.get("mtime_ns"):
+        if _file_digest(csv_path) != meta.get("sha256"):
+            return None
+        meta.update(signature)
+        # Only saves the hash next time; a read-only data dir is fine.
+        try:
+            _write_json(meta_path, meta)
+        except OSError:
+            pass
+
+    coerced = meta.get("coerced_timestamps", {})
+    if columns is not None:
+        columns = list(columns)
+        coerced = {col: n for col, n in coerced.items() if col in columns}
+    try:
+        frame = pd.read_parquet(snapshot_path, columns=columns)
+    except (OSError, ValueError):
+        return None
+    return frame, coerced
+
+
+def _write_snapshot(frame, csv_path, snapshot_path, meta_path, schema_key,
+                    coerced):
+    """Write *frame* and its source signature next to the CSV data.
+
+    Snapshots are an optimisation only: if the directory is not writable the
+    error is swallowed and the table is simply re-read from CSV next time.
+    """
+    signature = _file_signature(csv_path)
+    # The high-water mark: size (byte offset), rows and tail checksum (plus
+    # a head checksum, which catches re-sorted or re-exported files).
+    meta = {
+        "version": _SNAPSHOT_VERSION,
+        "schema": schema_key,
+        "sha256": _file_digest(csv_path),
+        "rows": len(frame),
+        "head_sha256": _tail_digest(csv_path, min(signature["size"],
+                                                  _TAIL_BYTES)),
+        "tail_sha256": _tail_digest(csv_path, signature["size"]),
+        "coerced_timestamps": coerced,
+    }
+    meta.update(signature)
+    try:
+        os.makedirs(os.path.dirname(snapshot_path), exist_ok=True)
+        tmp_path = snapshot_path + ".tmp"
+        frame.to_parquet(tmp_path, index=False)
+        os.replace(tmp_path, snapshot_path)
+        _write_json(meta_path, meta)
+    except OSError:
+        pass
+
+
+def _concat_rows(frames):
+    """Concatenate row blocks of one table, keeping categoricals categorical.
+
+    Categorical columns get the sorted union of the blocks' categories (as
+    a single ``read_csv`` of all rows would produce) instead of falling
+    back to object dtype.
+    """
+    frames = list(frames)
+    for col in frames[0].columns:
+        if not isinstance(frames[0][col].dtype, pd.CategoricalDtype):
+            continue
+        categories = frames[0][col].cat.categories
+        for frame in frames[1:]:
+            categories = categories.union(frame[col].cat.categories)
+        dtype = pd.CategoricalDtype(categories)
+        frames = [frame.astype({col: dtype}) for frame in frames]
+    return pd.concat(frames, ignore_index=True)
+
+
+def _append_snapshot(csv_path, name, snapshot_path, meta_path, schema_key):
+    """Bring a snapshot up to date by parsing only rows appended to the CSV.
+
+    The CSV counts as appended to when it grew, the byte before the old
+    size is a line end and the checksums of its first bytes and of the
+    bytes before the old size still match.  Anything else (shrunk, edited,
+    rewritten) returns None so the caller rebuilds from scratch.
+
+    Returns
+    -------
+    tuple or None
+        ``(frame, coerced, appended_rows)`` for the whole table.
+    """
+    try:
+        with open(meta_path) as fh:
+            meta = json.load(fh)
+    except (OSError, ValueError):
+        return None
+    if (meta.get("version") != _SNAPSHOT_VERSION
+            or meta.get("schema") != schema_key
+            or not os.path.exists(snapshot_path)):
+        return None
+    offset = meta.get("size", 0)
+    if not 0 < offset < os.stat(csv_path).st_size:
+        return None
+    if (_tail_digest(csv_path, min(offset, _TAIL_BYTES))
+            != meta.get("head_sha256")
+            or _tail_digest(csv_path, offset) != meta.get("tail_sha256")):
+        return None
+    with open(csv_path, "rb") as fh:
+        header = fh.readline()
+        fh.seek(offset - 1)
+        if fh.read(1) != b"\n":
+            return None
+        appended = fh.read()
+
+    try:
+        frame = pd.read_parquet(snapshot_path)
+    except (OSError, ValueError):
+        return None
+    if len(frame) != meta.get("rows"):
+        return None
+    dtypes, date_cols = _csv_schema(name)
+    new_rows = pd.read_csv(io.BytesIO(header + appended), dtype=dtypes)
+    new_rows, new_coerced = _finish_frame(new_rows, None, date_cols)
+
+    frame = _concat_rows([frame, new_rows])
+    coerced = dict(meta.get("coerced_timestamps", {}))
+    for col, count in new_coerced.items():
+        coerced[col] = coerced.get(col, 0) + count
+    _write_snapshot(frame, csv_path, snapshot_path, meta_path, schema_key,
+                    coerced)
+    return frame, coerced, len(new_rows)
+
+
 # ---------------------------------------------------------------------------
 # Loading
 # ---------------------------------------------------------------------------
 
-def load_datasets(data_dir="ecommerce_data"):
+_PARALLEL_MODES = {
+    "thread": ThreadPoolExecutor,
+    "process": ProcessPoolExecutor,
+}
+
+
+def _load_table(data_dir, name, use_snapshot, rebuild_snapshot,
+                columns=None):
+    """Load one table (or just *columns* of it) from its snapshot or CSV.
+
+    Module-level (rather than nested in load_datasets) so it can be shipped
+    to a process pool.
+
+    A projected read takes its columns straight from a valid snapshot.
+    If the CSV has only grown since the snapshot, just the appended rows
+    are parsed and added to it.  Otherwise, the CSV is parsed in full once
+    to (re)build the snapshot when snapshots are on, and with ``usecols``
+    when they are off.
+
+    Returns
+    -------
+    tuple[pd.DataFrame, dict]
+        The table and its report entry.
+    """
+    started = time.perf_counter()
+    csv_path = os.path.join(data_dir, DATASET_FILES[name])
+    snapshot_path, meta_path = _snapshot_paths(data_dir, name)
+    schema_key = _schema_key(name)
+
+    cached, appended = None, 0
+    if use_snapshot and not rebuild_snapshot:
+        cached = _read_snapshot(csv_path, snapshot_path, meta_path, schema_key,
+                                columns)
+        if cached is None:
+            grown = _append_snapshot(csv_path, name, snapshot_path,
+                                     meta_path, schema_key)
+            if grown is not None:
+                frame, coerced, appended = grown
+                if columns is not None:
+                    frame = frame[list(columns)]
+                    coerced = {col: n for col, n in coerced.items()
+                               if col in columns}
+                cached = frame, coerced
+    if cached is not None:
+        frame, coerced = cached
+        source = "append" if appended else "snapshot"
+    elif use_snapshot:
+        frame, coerced = _read_table(csv_path, name)
+        _write_snapshot(frame, csv_path, snapshot_path, meta_path,
+                        schema_key, coerced)
+        if columns is not None:
+            frame = frame[list(columns)]
+            coerced = {col: n for col, n in coerced.items() if col in columns}
+        source = "csv"
+    else:
+        frame, coerced = _read_table(csv_path, name, columns=columns)
+        source = "csv"
+    return frame, {"source": source,
+                   "seconds": time.perf_counter() - started,
+                   "rows": len(frame),
+                   "appended_rows": appended,
+                   "coerced_timestamps": coerced}
+
+
+def load_datasets(data_dir="ecommerce_data", use_snapshot=True,
+                  rebuild_snapshot=False, return_report=False,
+                  parallel=None, max_workers=None, tables=None,
+                  columns=None):
     """Load all e-commerce CSV files and return them as a dictionary.
 
+    Columns are typed according to ``SCHEMAS`` as they are read: IDs are
+    Arrow-backed strings, low-cardinality text is categorical and timestamp
+    columns are already datetime64.  Each CSV is cached as a Parquet
+    snapshot under ``<data_dir>/.snapshot``.  Later calls read the snapshot
+    instead of re-parsing the CSV for as long as the CSV is unchanged (same
+    size and mtime, or same content hash).  A CSV that was appended to is
+    not re-parsed either: the snapshot records a high-water mark (byte
+    offset, row count and a checksum of the bytes before the offset), and
+    only the rows past it are parsed and added.  A rewritten CSV is
+    re-parsed in full.  Snapshots are skipped when no Parquet engine
+    (pyarrow) is installed.
+
     Parameters
     ----------
     data_dir : str
         Path to the directory containing the CSV files.
+    use_snapshot : bool
+        Read from and write to the snapshot cache.  When False every table
+        is parsed from CSV and no snapshot is written.
+    rebuild_snapshot : bool
+        Ignore any existing snapshot, re-parse every CSV and overwrite the
+        snapshot with the fresh result.
+    return_report : bool
+        If True, also return a per-table report of where the data came from
+        and how long it took.
+    parallel : {None, "thread", "process"}
+        Load the tables concurrently on a thread or process pool.  Threads
+        suit the C-level CSV/Parquet readers, which release the GIL for most
+        of the work; processes avoid the GIL entirely at the cost of
+        pickling each table back to the caller.  None loads sequentially.
+    max_workers : int, optional
+        Pool size when ``parallel`` is set (defaults to one worker per
+        table loaded).
+    tables : list of str, optional
+        Load only these tables (keys of ``DATASET_FILES``).  None loads
+        every table, or the tables named in *columns* when it is given.
+    columns : dict[str, list of str], optional
+        Column projection: read only these columns of each listed table
+        (e.g. ``source_columns(...)`` output).  Projected columns come
+        straight from the columnar snapshot; without one, only they are
+        parsed from the CSV.  Tables loaded but not listed are read in full.
 
     Returns
     -------
     dict[str, pd.DataFrame]
         Keys: "orders", "order_items", "products", "customers", "reviews",
-        "payments".
-    """
-    datasets = {
-        "orders": pd.read_csv(f"{data_dir}/orders_dataset.csv"),
-        "order_items": pd.read_csv(f"{data_dir}/order_items_dataset.csv"),
-        "products": pd.read_csv(f"{data_dir}/products_dataset.csv"),
-        "customers": pd.read_csv(f"{data_dir}/customers_dataset.csv"),
-        "reviews": pd.read_csv(f"{data_dir}/order_reviews_dataset.csv"),
-        "payments": pd.read_csv(f"{data_dir}/order_payments_dataset.csv"),
-    }
+        "payments" (or just *tables*).
+    dict[str, dict], optional
+        Only when ``return_report`` is True.  Maps each table name to
+        ``{"source": "snapshot" | "append" | "csv", "seconds": float,
+        "rows": int, "appended_rows": int,
+        "coerced_timestamps": {column: int}}``, where ``seconds`` is the
+        wall time spent loading that table, ``appended_rows`` counts the
+        rows parsed because they were appended to the CSV since the
+        snapshot ("append") and ``coerced_timestamps`` counts the
+        timestamp values that could not be parsed.
+    """
+    if parallel is not None and parallel not in _PARALLEL_MODES:
+        raise ValueError(
+            f"parallel must be None, 'thread' or 'process', got {parallel!r}"
+        )
+    columns = columns or {}
+    if tables is not None:
+        names = list(tables)
+    elif columns:
+        names = list(columns)
+    else:
+        names = list(DATASET_FILES)
+    unknown = [name for name in {*names, *columns} if name not in DATASET_FILES]
+    if unknown:
+        raise ValueError(f"unknown tables: {sorted(unknown)}")
+    use_snapshot = use_snapshot and _HAS_PYARROW
+    args = [(data_dir, name, use_snapshot, rebuild_snapshot, columns.get(name))
+            for name in names]
+
+    if parallel is None:
+        results = [_load_table(*arg) for arg in args]
+    else:
+        workers = max_workers or max(len(names), 1)
+        with _PARALLEL_MODES[parallel](max_workers=workers) as pool:
+            results = list(pool.map(_load_table, *zip(*args)))
+
+    datasets = {name: frame for name, (frame, _) in zip(names, results)}
+    report = {name: entry for name, (_, entry) in zip(names, results)}
+    if return_report:
+        return datasets, report
     return datasets
 
 
+# Tables the exports only ever append to; rows appended to them can be merged
+# into derived tables instead of rebuilding those.
+APPEND_ONLY_TABLES = ("orders", "order_items")
+
+
+def appended_since(report, previous_rows, append_only=APPEND_ONLY_TABLES):
+    """Where the new rows of each table start, relative to an earlier load.
+
+    Parameters
+    ----------
+    report : dict[str, dict]
+        Load report from ``load_datasets(..., return_report=True)``.
+    previous_rows : dict[str, int] or None
+        Row count of each table at the earlier load.
+    append_only : iterable of str
+        Tables allowed to have grown.
+
+    Returns
+    -------
+    dict[str, int] or None
+        Per table, the number of leading rows that were already loaded
+        (rows from there on are new).  None when the tables cannot be
+        updated incrementally: no earlier load, a table re-parsed in full
+        (rewritten CSV), a table that grew but is not append-only, or row
+        counts that do not line up with the earlier load.
+    """
+    if not previous_rows:
+        return None
+    since = {}
+    for name, entry in report.items():
+        before = entry["rows"] - entry["appended_rows"]
+        if entry["source"] == "csv" or previous_rows.get(name) != before:
+            return None
+        if entry["appended_rows"] and name not in append_only:
+            return None
+        since[name] = before
+    return since
+
+
+def scan(data_dir="ecommerce_data", use_snapshot=True):
+    """Start a lazy query plan over the tables in *data_dir*.
+
+    Nothing is read until the plan is executed, e.g.
+    ``scan(data_dir).delivered().between(a, b).metric("revenue_by_state")``.
+    See ``query.Plan``.
+
+    Parameters
+    ----------
+    data_dir : str
+    use_snapshot : bool
+        Passed to ``load_datasets`` when the plan runs.
+
+    Returns
+    -------
+    query.Plan
+    """
+    # Imported here: query builds on this module and business_metrics.
+    from query import Plan
+    return Plan(data_dir=data_dir, use_snapshot=use_snapshot)
+
+
+def read_table_chunks(data_dir, name, chunksize=100_000, columns=None):
+    """Stream one table from its CSV in typed chunks of bounded size.
+
+    For tables too large to load whole: at most *chunksize* rows are held
+    at a time.  Chunks are typed by ``SCHEMAS`` like ``load_datasets``
+    output, except that categorical columns get the categories seen in
+    each chunk, so compare them by label rather than by code.
+
+    Parameters
+    ----------
+    data_dir : str
+    name : str
+        A key of ``DATASET_FILES``.
+    chunksize : int
+        Rows per chunk.
+    columns : list of str, optional
+        Read only these columns (``usecols``).
+
+    Yields
+    ------
+    pd.DataFrame
+    """
+    if name not in DATASET_FILES:
+        raise ValueError(f"unknown tables: {[name]}")
+    usecols = None if columns is None else list(columns)
+    dtypes, date_cols = _csv_schema(name, usecols)
+    csv_path = os.path.join(data_dir, DATASET_FILES[name])
+    with pd.read_csv(csv_path, dtype=dtypes, usecols=usecols,
+                     chunksize=chunksize) as reader:
+        for chunk in reader:
+            yield _finish_frame(chunk, usecols, date_cols)[0]
+
+
+# ---------------------------------------------------------------------------
+# Key interning
+# ---------------------------------------------------------------------------
+
+KEY_COLUMNS = ("order_id", "customer_id", "product_id", "seller_id")
+
+
+def intern_keys(datasets, key_columns=KEY_COLUMNS, labels=None):
+    """Replace string ID columns with dense integer codes.
+
+    Each key is factorized once over every table that carries it, so the
+    same ID gets the same code everywhere and merges, group-bys and
+    ``nunique`` work on integers instead of hashing strings.  Codes are
+    assigned in sorted ID order (0..n-1) and are int32 unless there are more
+    than 2**31 distinct values; missing IDs become -1.
+
+    Parameters
+    ----------
+    datasets : dict[str, pd.DataFrame]
+        Output of ``load_datasets``.
+    key_columns : iterable of str
+        ID columns to intern.
+    labels : dict[str, pd.Index], optional
+        Reverse lookup from an earlier call.  IDs it knows keep their codes
+        and unseen IDs are numbered after them (in sorted order among
+        themselves), so tables derived from the earlier call stay valid
+        after rows are appended.
+
+    Returns
+    -------
+    dict[str, pd.DataFrame]
+        Same tables with the key columns replaced by integer codes.  The
+        input frames are not modified.
+    dict[str, pd.Index]
+        Reverse lookup per key: ``labels[key][code]`` is the original ID.
+    """
+    coded = dict(datasets)
+    known_labels = labels or {}
+    labels = {}
+    for key in key_columns:
+        names = [name for name, frame in coded.items() if key in frame.columns]
+        if not names:
+            continue
+        values = pd.concat([coded[name][key] for name in names],
+                           ignore_index=True)
+        if key in known_labels:
+            codes, uniques = _extend_codes(values, known_labels[key])
+        else:
+            codes, uniques = pd.factorize(values, sort=True)
+        dtype = np.int32 if len(uniques) < np.iinfo(np.int32).max else np.int64
+        codes = codes.astype(dtype, copy=False)
+
+        offset = 0
+        for name in names:
+            n_rows = len(coded[name])
+            coded[name] = coded[name].assign(
+                **{key: codes[offset:offset + n_rows]}
+            )
+            offset += n_rows
+        labels[key] = pd.Index(uniques, name=key)
+    return coded, labels
+
+
+def _extend_codes(values, known):
+    """Codes of *values* under *known* labels, extended with unseen IDs."""
+    codes = known.get_indexer(values)
+    unseen = (codes < 0) & values.notna().to_numpy()
+    if not unseen.any():
+        return codes, known
+    new_codes, new_labels = pd.factorize(values[unseen], sort=True)
+    codes[unseen] = new_codes + len(known)
+    return codes, known.append(pd.Index(new_labels))
+
+
+def decode_keys(frame, key_labels, columns=None):
+    """Map interned key codes in *frame* back to their original string IDs.
+
+    Parameters
+    ----------
+    frame : pd.DataFrame
+        Any table or result carrying interned key columns.
+    key_labels : dict[str, pd.Index]
+        Reverse lookup returned by ``intern_keys``.
+    columns : iterable of str, optional
+        Key columns to decode.  Defaults to every column of *frame* that has
+        an entry in *key_labels*.
+
+    Returns
+    -------
+    pd.DataFrame
+        A new frame with string IDs (missing codes decode to NaN).
+    """
+    if columns is None:
+        columns = [col for col in frame.columns if col in key_labels]
+    decoded = {}
+    for col in columns:
+        codes = frame[col].to_numpy()
+        ids = key_labels[col].take(np.where(codes < 0, 0, codes))
+        decoded[col] = pd.Series(ids, index=frame.index).where(codes >= 0)
+    return frame.assign(**decoded)
+
+
+# ---------------------------------------------------------------------------
+# Copy-on-write
+# ---------------------------------------------------------------------------
+# The transformation steps below never modify their input: they derive new
+# frames with ``assign`` / ``take`` instead of ``copy()`` + setitem.  With
+# pandas copy-on-write those new frames share the unchanged columns with
+# their input, so the load path materializes row data only where rows are
+# actually selected.  Without it, ``assign`` still copies defensively.
+
+_PANDAS_MAJOR = int(pd.__version__.split(".")[0])
+
+
+def copy_on_write_enabled():
+    """True if pandas copy-on-write is active (always on in pandas >= 3)."""
+    if _PANDAS_MAJOR >= 3:
+        return True
+    return pd.get_option("mode.copy_on_write") is True
+
+
+def enable_copy_on_write():
+    """Turn on pandas copy-on-write for this process (no-op on pandas >= 3).
+
+    Call it once at start-up, before loading data.  It is a global pandas
+    option, so it is not set on import.
+    """
+    if _PANDAS_MAJOR < 3:
+        pd.set_option("mode.copy_on_write", True)
+
+
+# ---------------------------------------------------------------------------
+# Shared read-only tables
+# ---------------------------------------------------------------------------
+# A dashboard process serves every session from one copy of the prepared
+# tables.  ``SharedTables`` freezes them: column buffers are marked
+# read-only, so in-place writes raise, and a fingerprint of every column's
+# buffers is checked on each access, so a column added, dropped or replaced
+# on a shared frame is reported instead of silently leaking into other
+# sessions.
+
+def _read_only(array):
+    """A read-only view of a NumPy array (the array itself is untouched)."""
+    view = array.view()
+    view.flags.writeable = False
+    return view
+
+
+def _frozen_column(values):
+    """Column data of *values* backed by read-only buffers where possible.
+
+    NumPy, datetime and categorical columns get read-only views of their
+    buffers.  Arrow buffers are immutable already; the column gets its own
+    array object over them, so an assignment into the frozen frame (which
+    swaps that object's buffers) cannot reach the source frame.  Other
+    extension arrays are shared as they are.
+    """
+    if isinstance(values.dtype, np.dtype):
+        return _read_only(values.to_numpy())
+    array = values.array
+    if isinstance(array, pd.Categorical):
+        return pd.Categorical.from_codes(
+            _read_only(array.codes), dtype=array.dtype, validate=False)
+    if isinstance(array, pd.arrays.ArrowExtensionArray):
+        return array.copy()
+    return array
+
+
+def freeze_frame(frame):
+    """A read-only version of *frame* sharing its memory.
+
+    Parameters
+    ----------
+    frame : pd.DataFrame
+
+    Returns
+    -------
+    pd.DataFrame
+        Same columns, dtypes and index; in-place value writes (``.loc`` /
+        ``.iloc`` assignment, writes through ``to_numpy()``) raise.
+    """
+    return pd.DataFrame(
+        {col: _frozen_column(frame[col]) for col in frame.columns},
+        index=frame.index, copy=False,
+    )
+
+
+def _buffer_fingerprint(values):
+    """Identity of the buffers behind a column (not of their contents)."""
+    if isinstance(values.dtype, np.dtype):
+        return values.to_numpy().__array_interface__["data"][0]
+    array = values.array
+    if isinstance(array, pd.Categorical):
+        return array.codes.__array_interface__["data"][0], id(array.dtype)
+    if isinstance(array, pd.arrays.ArrowExtensionArray):
+        chunked = array.__arrow_array__()
+        return tuple(buffer.address for chunk in chunked.chunks
+                     for buffer in chunk.buffers() if buffer is not None)
+    # Writable extension arrays (e.g. python-storage strings) can change in
+    # place, so fall back to the (slower) contents.
+    return int(pd.util.hash_array(np.asarray(values, dtype=object)).sum())
+
+
+def _fingerprint(table):
+    """Fingerprint of a frozen table's structure and buffers."""
+    if isinstance(table, pd.DataFrame):
+        return (id(table.index), tuple(table.columns),
+                tuple(_buffer_fingerprint(table[col])
+                      for col in table.columns))
+    if isinstance(table, PrefixSums):
+        return (table.days.__array_interface__["data"][0],
+                tuple((measure, cum.__array_interface__["data"][0])
+                      for measure, cum in table.cumulative.items()))
+    return table.__array_interface__["data"][0]
+
+
+def _freeze(table):
+    """Read-only version of a frame, PrefixSums or NumPy array."""
+    if isinstance(table, pd.DataFrame):
+        return freeze_frame(table)
+    if isinstance(table, PrefixSums):
+        return PrefixSums(
+            days=_read_only(table.days),
+            cumulative=MappingProxyType({
+                measure: _read_only(cum)
+                for measure, cum in table.cumulative.items()
+            }),
+        )
+    if isinstance(table, np.ndarray):
+        return _read_only(table)
+    raise TypeError(f"cannot freeze {type(table).__name__}")
+
+
+class SharedTablesModified(RuntimeError):
+    """A table held by ``SharedTables`` was modified after freezing."""
+
+
+@dataclass(frozen=True)
+class SharedTables:
+    """Immutable bundle of tables meant to be shared between callers.
+
+    Construction freezes every table (see ``freeze_frame``; PrefixSums and
+    NumPy arrays are frozen likewise) without copying data.  Unpacking the
+    bundle (or calling ``verify``) checks that no table has been modified
+    since, so every consumer that goes through it fails loudly rather than
+    seeing another consumer's changes.
+
+    Example::
+
+        shared = SharedTables((delivered, cube, prefix_sums))
+        delivered, cube, prefix_sums = shared
+
+    Attributes
+    ----------
+    tables : tuple
+        The frozen DataFrames, PrefixSums or NumPy arrays.
+    """
+
+    tables: tuple
+    fingerprint: tuple = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self):
+        tables = tuple(_freeze(table) for table in self.tables)
+        object.__setattr__(self, "tables", tables)
+        object.__setattr__(self, "fingerprint",
+                           tuple(_fingerprint(table) for table in tables))
+
+    def verify(self):
+        """Raise ``SharedTablesModified`` if any table was modified."""
+        for position, (table, expected) in enumerate(
+                zip(self.tables, self.fingerprint)):
+            if _fingerprint(table) != expected:
+                raise SharedTablesModified(
+                    f"shared table {position} ({type(table).__name__}) was "
+                    "modified after it was frozen; derive a new frame "
+                    "(assign, copy) instead of changing the shared one"
+                )
+
+    def __iter__(self):
+        self.verify()
+        return iter(self.tables)
+
+    def __len__(self):
+        return len(self.tables)
+
+
 # ---------------------------------------------------------------------------
 # Cleaning / type conversion
 # ---------------------------------------------------------------------------
@@ -53,6 +1019,8 @@ _ORDER_DATE_COLS = [
 def parse_order_dates(orders):
     """Convert date-string columns in the orders table to datetime.
 
+    Columns already parsed by ``load_datasets`` are passed through as-is.
+
     Parameters
     ----------
     orders : pd.DataFrame
@@ -61,45 +1029,566 @@ def parse_order_dates(orders):
     Returns
     -------
     pd.DataFrame
-        Orders with datetime-typed date columns.
+        Orders with datetime-typed date columns.  *orders* itself is not
+        modified.
     """
-    orders = orders.copy()
-    for col in _ORDER_DATE_COLS:
-        if col in orders.columns:
-            orders[col] = pd.to_datetime(orders[col], errors="coerce")
-    return orders
+    parsed = {
+        col: parse_timestamps(orders[col])[0]
+        for col in _ORDER_DATE_COLS
+        if col in orders.columns
+    }
+    return orders.assign(**parsed)
 
 
 # ---------------------------------------------------------------------------
 # Merging
 # ---------------------------------------------------------------------------
 
-def build_sales_data(order_items, orders):
+_SALES_ITEM_COLS = ["order_id", "order_item_id", "product_id", "seller_id",
+                    "price"]
+_SALES_ORDER_COLS = ["order_id", "order_status", "order_purchase_timestamp",
+                     "order_delivered_customer_date"]
+
+
+def _present(frame, columns):
+    """The subset of *columns* that *frame* has, in the given order."""
+    return [col for col in columns if col in frame.columns]
+
+
+def _order_mask(orders, status=None, start_date=None, end_date=None):
+    """Boolean mask of orders matching a status and purchase-date window.
+
+    Date bounds follow ``filter_by_date_range``; either may be None for an
+    open-ended window.  Returns None when no predicate is given.
+    """
+    mask = None
+    if status is not None:
+        statuses = [status] if isinstance(status, str) else list(status)
+        mask = orders["order_status"].isin(statuses).to_numpy()
+    if start_date is not None or end_date is not None:
+        purchased = orders["order_purchase_timestamp"]
+        in_window = np.ones(len(orders), dtype=bool)
+        if start_date is not None:
+            in_window &= (purchased >= pd.Timestamp(start_date)).to_numpy()
+        if end_date is not None:
+            end, end_inclusive = _end_bound(end_date)
+            before = purchased <= end if end_inclusive else purchased < end
+            in_window &= before.to_numpy()
+        mask = in_window if mask is None else mask & in_window
+    return mask
+
+
+def filter_orders(orders, status=None, start_date=None, end_date=None):
+    """Orders matching a status and an inclusive purchase-date window.
+
+    Parameters
+    ----------
+    orders : pd.DataFrame
+        Must contain ``order_status`` and a datetime
+        ``order_purchase_timestamp`` for the predicates that are given.
+    status : str or list of str, optional
+    start_date, end_date : str or datetime, optional
+        As in ``filter_by_date_range``; either may be None for an
+        open-ended window.
+
+    Returns
+    -------
+    pd.DataFrame
+        The matching rows, in their original order (*orders* itself when
+        no predicate is given).
+    """
+    keep = _order_mask(orders, status, start_date, end_date)
+    if keep is None:
+        return orders
+    return orders.take(np.flatnonzero(keep))
+
+
+def build_sales_data(order_items, orders, status=None, start_date=None,
+                     end_date=None):
     """Merge order items with order-level information.
 
     Only the columns needed for downstream analysis are kept:
-    order_id, order_item_id, product_id, price, order_status,
-    order_purchase_timestamp, order_delivered_customer_date.
+    order_id, order_item_id, product_id, seller_id, price, order_status,
+    order_purchase_timestamp, order_delivered_customer_date.  Inputs read
+    with a column projection may lack some of these; the rest are kept.
+
+    Status and date predicates are applied to *orders* before the join,
+    so only items of the surviving orders are matched and materialized;
+    a narrow window builds a fraction of the full table.  The result
+    equals building the full table and filtering it afterwards.
 
     Parameters
     ----------
     order_items : pd.DataFrame
     orders : pd.DataFrame
         Should already have datetime-typed date columns.
+    status : str or list of str, optional
+        Keep only orders with this status (or any of these statuses).
+    start_date : str or datetime, optional
+        Inclusive lower bound on ``order_purchase_timestamp``.
+    end_date : str or datetime, optional
+        Inclusive upper bound; a bare date includes that whole day, as in
+        ``filter_by_date_range``.
 
     Returns
     -------
     pd.DataFrame
     """
-    sales = pd.merge(
-        order_items[["order_id", "order_item_id", "product_id", "price"]],
-        orders[["order_id", "order_status", "order_purchase_timestamp",
-                "order_delivered_customer_date"]],
-        on="order_id",
-    )
+    items = order_items[_present(order_items, _SALES_ITEM_COLS)]
+    orders = orders[_present(orders, _SALES_ORDER_COLS)]
+    orders = filter_orders(orders, status, start_date, end_date)
+    # The inner join builds its hash table on the (filtered) orders and
+    # only emits items whose order survived, i.e. it is the semi-join.
+    sales = pd.merge(items, orders, on="order_id")
     return sales
 
 
+def distinct_reviews(reviews):
+    """Distinct (order_id, review_score) pairs of the reviews table.
+
+    This is the unit every review metric counts: an order reviewed twice
+    with the same score counts once, with two different scores twice.
+
+    Parameters
+    ----------
+    reviews : pd.DataFrame
+        Must contain ``order_id`` and ``review_score``.
+
+    Returns
+    -------
+    pd.DataFrame
+        Columns: order_id, review_score.
+    """
+    return (reviews[["order_id", "review_score"]]
+            .drop_duplicates(ignore_index=True))
+
+
+def build_order_facts(order_items, orders, customers=None):
+    """Build an order-level fact table: one row per order that has items.
+
+    This is the cheaper grain for order-level metrics (order counts, AOV,
+    delivery averages): items are reduced to per-order totals once here
+    instead of being regrouped or de-duplicated by every metric.
+    ``filter_delivered``, ``filter_by_year`` and ``filter_by_date_range``
+    accept it just like item-level sales data.  Review scores are not
+    attached, since an order can have several; pass the reviews to
+    ``business_metrics.review_delivery_summary`` instead.
+
+    Parameters
+    ----------
+    order_items : pd.DataFrame
+        Must contain ``order_id`` and ``price``; ``freight_value`` is
+        summed into ``freight`` when present.
+    orders : pd.DataFrame
+        Should already have datetime-typed date columns.
+    customers : pd.DataFrame, optional
+        If given, adds ``customer_state``.
+
+    Returns
+    -------
+    pd.DataFrame
+        Columns: order_id, customer_id, order_status,
+        order_purchase_timestamp, order_delivered_customer_date,
+        delivery_days, revenue, item_count, freight (when order_items has
+        freight_value), plus customer_state when *customers* is given.
+    """
+    aggregations = {"revenue": ("price", "sum"),
+                    "item_count": ("price", "size")}
+    if "freight_value" in order_items.columns:
+        aggregations["freight"] = ("freight_value", "sum")
+    per_order = (
+        order_items
+        .groupby("order_id", sort=False)
+        .agg(**aggregations)
+        .reset_index()
+    )
+    facts = orders[["order_id", "customer_id", "order_status",
+                    "order_purchase_timestamp",
+                    "order_delivered_customer_date"]].merge(per_order,
+                                                            on="order_id")
+    facts["delivery_days"] = (
+        facts["order_delivered_customer_date"]
+        - facts["order_purchase_timestamp"]
+    ).dt.days
+    if customers is not None:
+        facts = facts.merge(customers[["customer_id", "customer_state"]],
+                            on="customer_id", how="left")
+    return facts
+
+
+ENRICHED_COLUMNS = ["product_category_name", "customer_id",
+                    "customer_state", "customer_city",
+                    "customer_zip_code_prefix"]
+
+
+def _attach(frame, table, key, columns):
+    """Left-join the ``columns`` of ``table`` that ``frame`` lacks."""
+    missing = [col for col in columns
+               if col in table.columns and col not in frame.columns]
+    if not missing or key not in frame.columns:
+        return frame
+    return frame.merge(table[[key, *missing]], on=key, how="left")
+
+
+def enrich_sales(sales_data, products, orders, customers):
+    """Denormalize dimension attributes onto a sales fact table, once.
+
+    Attaches the product category and the buying customer's state, city
+    and zip prefix, so category and geography breakdowns become plain
+    group-bys with no joins at query time.  Every attribute has one value
+    per item, so the result keeps one row per input row and stays safe for
+    revenue sums.  Review scores are not attached: an order can have
+    several, so they are joined by ``distinct_reviews`` /
+    ``business_metrics.review_delivery_summary`` where review metrics need
+    them.  Left joins keep every row and its order, so the result can be
+    enriched before or after ``filter_delivered``.  Columns the frame
+    already has are left as they are, which makes the step safe to apply
+    to ``build_order_facts`` output as well.
+
+    Text attributes (and ``seller_id`` if it is not interned) are stored
+    as categoricals, i.e. integer codes plus one copy of each label.
+
+    Parameters
+    ----------
+    sales_data : pd.DataFrame
+        Output of ``build_sales_data`` or ``build_order_facts``.
+    products : pd.DataFrame
+        Must contain ``product_id`` and ``product_category_name``.
+    orders : pd.DataFrame
+        Must contain ``order_id`` and ``customer_id``.
+    customers : pd.DataFrame
+        Must contain ``customer_id``; ``customer_state``,
+        ``customer_city`` and ``customer_zip_code_prefix`` are attached
+        when present.
+
+    Returns
+    -------
+    pd.DataFrame
+        ``sales_data`` plus whichever of ENRICHED_COLUMNS it lacked.
+        Rows without a matching dimension row keep NaN.
+    """
+    enriched = _attach(sales_data, products, "product_id",
+                       ["product_category_name"])
+    enriched = _attach(enriched, orders, "order_id", ["customer_id"])
+    enriched = _attach(enriched, customers, "customer_id",
+                       ["customer_state", "customer_city",
+                        "customer_zip_code_prefix"])
+
+    if enriched is sales_data:
+        return enriched
+    for col in ("product_category_name", "customer_state", "customer_city",
+                "seller_id"):
+        if (col in enriched.columns
+                and not pd.api.types.is_numeric_dtype(enriched[col])
+                and not isinstance(enriched[col].dtype, pd.CategoricalDtype)):
+            enriched[col] = enriched[col].astype("category")
+    return enriched
+
+
+# ---------------------------------------------------------------------------
+# Column projection
+# ---------------------------------------------------------------------------
+# Source columns each column of the prepared sales frame (build_sales_data
+# -> filter_delivered -> add_delivery_speed -> enrich_sales) comes from.
+# SALES_BASE_COLUMNS are always needed: the join key plus the status and
+# purchase timestamp that filtering and sorting use.
+
+SALES_BASE_COLUMNS = {
+    "orders": ["order_id", "order_status", "order_purchase_timestamp"],
+    "order_items": ["order_id"],
+}
+
+SALES_LINEAGE = {
+    "order_id": {},
+    "order_status": {},
+    "order_purchase_timestamp": {},
+    "year": {},
+    "month": {},
+    "order_item_id": {"order_items": ["order_item_id"]},
+    "product_id": {"order_items": ["product_id"]},
+    "seller_id": {"order_items": ["seller_id"]},
+    "price": {"order_items": ["price"]},
+    "order_delivered_customer_date": {
+        "orders": ["order_delivered_customer_date"],
+    },
+    "delivery_days": {"orders": ["order_delivered_customer_date"]},
+    "product_category_name": {
+        "order_items": ["product_id"],
+        "products": ["product_id", "product_category_name"],
+    },
+    "customer_id": {"orders": ["customer_id"]},
+    "customer_state": {
+        "orders": ["customer_id"],
+        "customers": ["customer_id", "customer_state"],
+    },
+    "customer_city": {
+        "orders": ["customer_id"],
+        "customers": ["customer_id", "customer_city"],
+    },
+    "customer_zip_code_prefix": {
+        "orders": ["customer_id"],
+        "customers": ["customer_id", "customer_zip_code_prefix"],
+    },
+    "review_score": {"reviews": ["order_id", "review_score"]},
+}
+
+
+def source_columns(columns):
+    """Table columns to read to produce the given sales-frame columns.
+
+    Parameters
+    ----------
+    columns : iterable of str
+        Keys of ``SALES_LINEAGE``, e.g.
+        ``business_metrics.required_columns(...)`` output.
+
+    Returns
+    -------
+    dict[str, list of str]
+        Table name -> columns, suitable for ``load_datasets(columns=...)``.
+    """
+    columns = list(columns)
+    unknown = [col for col in columns if col not in SALES_LINEAGE]
+    if unknown:
+        raise ValueError(
+            f"unknown columns {unknown}; available: {sorted(SALES_LINEAGE)}"
+        )
+    reads = {table: list(cols) for table, cols in SALES_BASE_COLUMNS.items()}
+    for col in columns:
+        for table, sources in SALES_LINEAGE[col].items():
+            needed = reads.setdefault(table, [])
+            needed.extend(src for src in sources if src not in needed)
+    return reads
+
+
+# ---------------------------------------------------------------------------
+# Daily cube
+# ---------------------------------------------------------------------------
+
+CUBE_DIMENSIONS = ["day", "product_category_name", "customer_state",
+                   "order_status"]
+
+CUBE_MEASURES = ["revenue", "items", "orders", "delivery_days_sum",
+                 "delivery_days_count", "review_score_sum", "review_count"]
+
+
+def build_daily_cube(sales_data, products, orders, customers, reviews):
+    """Pre-aggregate item-level sales into a day x category x state x status cube.
+
+    Each cell holds additive measures, so any date range is answered by
+    summing the cells of the days it covers:
+
+    - ``revenue`` / ``items``: sum and count of item prices.
+    - ``orders``: orders counted once, in the cell of their first item, so
+      order counts add up exactly over any set of cells.  (Per-category
+      order counts therefore attribute multi-category orders to one
+      category.)
+    - ``review_score_sum`` / ``review_count``: one entry per distinct
+      (order, review score), attributed like ``orders``.
+    - ``delivery_days_sum`` / ``delivery_days_count``: delivery days of
+      those same reviewed rows, mirroring what ``review_delivery_summary``
+      feeds into ``average_delivery_days``.
+
+    Parameters
+    ----------
+    sales_data : pd.DataFrame
+        Output of ``build_sales_data`` (all statuses, datetime columns).
+    products : pd.DataFrame
+        Must contain ``product_id`` and ``product_category_name``.
+    orders : pd.DataFrame
+        Must contain ``order_id`` and ``customer_id``.
+    customers : pd.DataFrame
+        Must contain ``customer_id`` and ``customer_state``.
+    reviews : pd.DataFrame
+        Must contain ``order_id`` and ``review_score``.
+
+    Returns
+    -------
+    pd.DataFrame
+        Columns: CUBE_DIMENSIONS + CUBE_MEASURES, sorted by ``day``.
+        Items without a known category or state keep NaN in that dimension.
+    """
+    items = enrich_sales(
+        sales_data[["order_id", "product_id", "price", "order_status",
+                    "order_purchase_timestamp",
+                    "order_delivered_customer_date"]],
+        products, orders, customers,
+    )
+
+    order_reviews = (
+        distinct_reviews(reviews)
+        .groupby("order_id")["review_score"]
+        .agg(review_score_sum="sum", review_count="size")
+        .reset_index()
+    )
+    items = items.merge(order_reviews, on="order_id", how="left")
+
+    first_item = ~items["order_id"].duplicated()
+    review_count = items["review_count"].where(first_item, 0).fillna(0)
+    review_score_sum = items["review_score_sum"].where(first_item, 0).fillna(0)
+    delivery_days = (
+        items["order_delivered_customer_date"]
+        - items["order_purchase_timestamp"]
+    ).dt.days
+    has_days = delivery_days.notna()
+
+    items = pd.DataFrame({
+        "day": items["order_purchase_timestamp"].dt.normalize(),
+        "product_category_name": items["product_category_name"],
+        "customer_state": items["customer_state"],
+        "order_status": items["order_status"],
+        "revenue": items["price"],
+        "items": 1,
+        "orders": first_item.astype("int64"),
+        "delivery_days_sum": (delivery_days * review_count).where(has_days, 0),
+        "delivery_days_count": review_count.where(has_days, 0),
+        "review_score_sum": review_score_sum,
+        "review_count": review_count,
+    })
+    cube = (
+        items
+        .groupby(CUBE_DIMENSIONS, observed=True, dropna=False, sort=False)
+        [CUBE_MEASURES]
+        .sum()
+        .reset_index()
+        .sort_values("day", kind="stable", ignore_index=True)
+    )
+    counts = ["items", "orders", "delivery_days_count", "review_count"]
+    cube[counts] = cube[counts].astype("int64")
+    return cube
+
+
+def merge_daily_cubes(cube, other):
+    """Add the cells of two daily cubes.
+
+    For appended data: the cube of the new rows' ``build_sales_data``
+    output merged into the existing cube equals the cube of all rows,
+    provided the new items belong to orders that had no items before (an
+    order's count and review are attributed to its first item).
+
+    Parameters
+    ----------
+    cube, other : pd.DataFrame
+        Outputs of ``build_daily_cube``.
+
+    Returns
+    -------
+    pd.DataFrame
+        The combined cube, sorted by ``day``.
+    """
+    merged = (
+        _concat_rows([cube, other])
+        .groupby(CUBE_DIMENSIONS, observed=True, dropna=False, sort=False)
+        [CUBE_MEASURES]
+        .sum()
+        .reset_index()
+        .sort_values("day", kind="stable", ignore_index=True)
+    )
+    counts = ["items", "orders", "delivery_days_count", "review_count"]
+    merged[counts] = merged[counts].astype("int64")
+    return merged
+
+
+def filter_cube(cube, start_date, end_date, status="delivered"):
+    """Return the cube cells for an inclusive date range.
+
+    The cube has day resolution: every day from ``start_date`` through
+    ``end_date`` is included whole, which matches ``filter_by_date_range``
+    for date-only bounds.  Days are located by binary search, so the cost
+    is proportional to the number of cells in range.
+
+    Parameters
+    ----------
+    cube : pd.DataFrame
+        Output of ``build_daily_cube``.
+    start_date, end_date : str or datetime
+        Inclusive day bounds.
+    status : str or None
+        Keep only cells with this ``order_status`` (None keeps all).
+
+    Returns
+    -------
+    pd.DataFrame
+    """
+    days = cube["day"]
+    lo = days.searchsorted(pd.Timestamp(start_date).normalize(), side="left")
+    hi = days.searchsorted(pd.Timestamp(end_date).normalize(), side="right")
+    cells = cube.iloc[lo:hi]
+    if status is not None:
+        cells = cells[cells["order_status"] == status]
+    return cells
+
+
+@dataclass(frozen=True)
+class PrefixSums:
+    """Cumulative daily totals for O(1) date-range sums.
+
+    ``cumulative[measure][i]`` is the sum of *measure* over the first *i*
+    days, so the total over days ``lo..hi-1`` is one subtraction.
+
+    Attributes
+    ----------
+    days : np.ndarray
+        Sorted datetime64 days that have at least one cube cell.
+    cumulative : dict[str, np.ndarray]
+        Per measure, ``len(days) + 1`` running totals starting at 0.
+    """
+
+    days: np.ndarray
+    cumulative: dict
+
+    def totals(self, start_date, end_date):
+        """Sum every measure over an inclusive day range.
+
+        Bounds have day resolution, like ``filter_cube``.
+
+        Parameters
+        ----------
+        start_date, end_date : str or datetime
+
+        Returns
+        -------
+        dict[str, float]
+            Measure name to total (0 for an empty range).
+        """
+        lo = np.searchsorted(
+            self.days, pd.Timestamp(start_date).normalize().to_datetime64(),
+            side="left",
+        )
+        hi = np.searchsorted(
+            self.days, pd.Timestamp(end_date).normalize().to_datetime64(),
+            side="right",
+        )
+        hi = max(hi, lo)
+        return {measure: float(cum[hi] - cum[lo])
+                for measure, cum in self.cumulative.items()}
+
+
+def build_prefix_sums(cube, status="delivered"):
+    """Collapse the daily cube to one row per day and prefix-sum each measure.
+
+    Parameters
+    ----------
+    cube : pd.DataFrame
+        Output of ``build_daily_cube``.
+    status : str or None
+        Only count cells with this ``order_status`` (None keeps all).
+
+    Returns
+    -------
+    PrefixSums
+    """
+    if status is not None:
+        cube = cube[cube["order_status"] == status]
+    daily = cube.groupby("day", sort=True)[CUBE_MEASURES].sum()
+    cumulative = {}
+    for measure in CUBE_MEASURES:
+        running = np.zeros(len(daily) + 1, dtype="float64")
+        np.cumsum(daily[measure].to_numpy(dtype="float64"), out=running[1:])
+        cumulative[measure] = running
+    return PrefixSums(days=daily.index.to_numpy(), cumulative=cumulative)
+
+
 # ---------------------------------------------------------------------------
 # Filtering
 # ---------------------------------------------------------------------------
@@ -107,6 +1596,12 @@ def build_sales_data(order_items, orders):
 def filter_delivered(sales_data):
     """Return only rows with order_status == 'delivered'.
 
+    Works on item-level sales data and on the order-level fact table alike.
+
+    Rows are sorted by ``order_purchase_timestamp`` (stable, so items keep
+    their order within a purchase) which lets ``filter_by_year`` and
+    ``filter_by_date_range`` locate a time range by binary search.
+
     Parameters
     ----------
     sales_data : pd.DataFrame
@@ -116,12 +1611,60 @@ def filter_delivered(sales_data):
     pd.DataFrame
         A copy filtered to delivered orders, with year and month columns added.
     """
-    delivered = sales_data[sales_data["order_status"] == "delivered"].copy()
+    # Select and sort in one positional take instead of a mask copy followed
+    # by a sort copy.
+    rows = np.flatnonzero(sales_data["order_status"] == "delivered")
+    purchased = sales_data["order_purchase_timestamp"].to_numpy()[rows]
+    rows = rows[np.argsort(purchased, kind="stable")]
+    delivered = sales_data.take(rows)
     delivered["year"] = delivered["order_purchase_timestamp"].dt.year
     delivered["month"] = delivered["order_purchase_timestamp"].dt.month
     return delivered
 
 
+def append_delivered(delivered, new_delivered):
+    """Merge newly filtered rows into a ``filter_delivered`` table.
+
+    Parameters
+    ----------
+    delivered, new_delivered : pd.DataFrame
+        ``filter_delivered`` outputs for the existing and the appended rows.
+
+    Returns
+    -------
+    pd.DataFrame
+        All rows sorted by purchase time, new rows after existing ones
+        with the same timestamp, with a fresh RangeIndex.
+    """
+    combined = _concat_rows([delivered, new_delivered])
+    order = np.argsort(combined["order_purchase_timestamp"].to_numpy(),
+                       kind="stable")
+    return combined.take(order).reset_index(drop=True)
+
+
+def _purchase_range(delivered, lower, upper, upper_side):
+    """Rows whose purchase timestamp lies between *lower* and *upper*.
+
+    On a frame sorted by purchase time (as produced by ``filter_delivered``)
+    the bounds are found with two binary searches and a positional slice of
+    the original frame is returned, so no row data is scanned or copied.
+    Unsorted input falls back to taking the matching rows.
+
+    *lower* is always inclusive; *upper_side* is "right" for an inclusive
+    and "left" for an exclusive upper bound.
+    """
+    purchased = delivered["order_purchase_timestamp"]
+    if purchased.is_monotonic_increasing:
+        lo = purchased.searchsorted(lower, side="left")
+        hi = purchased.searchsorted(upper, side=upper_side)
+        return delivered.iloc[lo:hi]
+    if upper_side == "right":
+        mask = (purchased >= lower) & (purchased <= upper)
+    else:
+        mask = (purchased >= lower) & (purchased < upper)
+    return delivered.take(np.flatnonzero(mask))
+
+
 def filter_by_year(delivered, year):
     """Return delivered-sales rows for a specific year.
 
@@ -134,8 +1677,53 @@ def filter_by_year(delivered, year):
     Returns
     -------
     pd.DataFrame
+        A slice of *delivered* when it is sorted by purchase time (treat it
+        as read-only, or ``.copy()`` it before modifying).
+    """
+    return _purchase_range(
+        delivered,
+        pd.Timestamp(year=year, month=1, day=1),
+        pd.Timestamp(year=year + 1, month=1, day=1),
+        upper_side="left",
+    )
+
+
+def _is_date_only(value):
+    """True for a ``datetime.date`` or an ISO date string without a time."""
+    if isinstance(value, datetime.datetime):  # includes pd.Timestamp
+        return False
+    if isinstance(value, datetime.date):
+        return True
+    if isinstance(value, str):
+        try:
+            datetime.date.fromisoformat(value.strip())
+        except ValueError:
+            return False
+        return True
+    return False
+
+
+def _end_bound(end_date):
+    """Normalize an inclusive end bound to ``(end, end_inclusive)``.
+
+    A date-only end bound (a ``datetime.date`` or a string such as
+    '2023-12-31') stands for that whole calendar day, so it is turned into an
+    exclusive bound at the next midnight.  Timestamps, including an explicit
+    midnight, are used as given.
+    """
+    end = pd.Timestamp(end_date)
+    if _is_date_only(end_date):
+        return end + pd.Timedelta(days=1), False
+    return end, True
+
+
+def _day_bounds(start_date, end_date):
+    """Normalize a date range to ``(start, end, end_inclusive)`` timestamps.
+
+    See ``_end_bound`` for how the end bound is interpreted.
     """
-    return delivered[delivered["year"] == year].copy()
+    end, end_inclusive = _end_bound(end_date)
+    return pd.Timestamp(start_date), end, end_inclusive
 
 
 def filter_by_date_range(delivered, start_date, end_date):
@@ -148,19 +1736,19 @@ def filter_by_date_range(delivered, start_date, end_date):
     start_date : str or datetime
         Inclusive lower bound (e.g. '2023-01-01').
     end_date : str or datetime
-        Inclusive upper bound (e.g. '2023-12-31').
+        Inclusive upper bound (e.g. '2023-12-31').  A date without a time
+        (a ``datetime.date`` or a date-only string) includes every purchase
+        made on that day; a timestamp is compared as given.
 
     Returns
     -------
     pd.DataFrame
+        A slice of *delivered* when it is sorted by purchase time (treat it
+        as read-only, or ``.copy()`` it before modifying).
     """
-    start = pd.to_datetime(start_date)
-    end = pd.to_datetime(end_date)
-    mask = (
-        (delivered["order_purchase_timestamp"] >= start)
-        & (delivered["order_purchase_timestamp"] <= end)
-    )
-    return delivered[mask].copy()
+    start, end, end_inclusive = _day_bounds(start_date, end_date)
+    return _purchase_range(delivered, start, end,
+                           upper_side="right" if end_inclusive else "left")
 
 
 def add_delivery_speed(delivered):
@@ -175,14 +1763,361 @@ def add_delivery_speed(delivered):
     Returns
     -------
     pd.DataFrame
-        Same dataframe with an additional ``delivery_days`` column.
+        *delivered* with an additional ``delivery_days`` column (the input
+        itself is not modified).
     """
-    delivered = delivered.copy()
-    delivered["order_delivered_customer_date"] = pd.to_datetime(
-        delivered["order_delivered_customer_date"], errors="coerce"
-    )
-    delivered["delivery_days"] = (
+    delivered_date, _ = parse_timestamps(
         delivered["order_delivered_customer_date"]
-        - delivered["order_purchase_timestamp"]
-    ).dt.days
-    return delivered
+    )
+    return delivered.assign(
+        order_delivered_customer_date=delivered_date,
+        delivery_days=(
+            delivered_date - delivered["order_purchase_timestamp"]
+        ).dt.days,
+    )
+
+
+# ---------------------------------------------------------------------------
+# Incremental refresh
+# ---------------------------------------------------------------------------
+
+def build_derived_tables(order_items, orders, products, customers, reviews):
+    """Build the dashboard's derived tables from the source tables.
+
+    Parameters
+    ----------
+    order_items, orders, products, customers, reviews : pd.DataFrame
+        Source tables (orders as returned by ``parse_order_dates``).
+
+    Returns
+    -------
+    tuple
+        ``(delivered_orders, cube, prefix_sums)``: the delivered rows of
+        ``build_order_facts``, ``build_daily_cube`` and its
+        ``build_prefix_sums``.
+    """
+    sales_data = build_sales_data(order_items, orders)
+    cube = build_daily_cube(sales_data, products, orders, customers, reviews)
+    order_facts = build_order_facts(order_items, orders)
+    return filter_delivered(order_facts), cube, build_prefix_sums(cube)
+
+
+def merge_appended(tables, since, order_items, orders, products, customers,
+                   reviews):
+    """Update ``build_derived_tables`` output with appended rows only.
+
+    Parameters
+    ----------
+    tables : tuple
+        ``(delivered_orders, cube, ...)`` derived from the earlier load.
+    since : dict[str, int]
+        ``appended_since`` output for ``orders`` and ``order_items``.
+    order_items, orders, products, customers, reviews : pd.DataFrame
+        Source tables of the current load.
+
+    Returns
+    -------
+    tuple or None
+        The same tables as ``build_derived_tables`` on all rows, or None
+        when the appended rows cannot be merged and the caller must
+        rebuild.
+    """
+    old_items = order_items.iloc[:since["order_items"]]
+    new_items = order_items.iloc[since["order_items"]:]
+    new_orders = orders.iloc[since["orders"]:]
+    # Order counts and reviews are attributed per order, so new items must
+    # belong to orders that had none before, and old items must not belong
+    # to new orders (they were left out of the previous join).
+    if (new_items["order_id"].isin(old_items["order_id"]).any()
+            or old_items["order_id"].isin(new_orders["order_id"]).any()):
+        return None
+    delivered_orders, cube, *_ = tables
+    new_sales = build_sales_data(new_items, orders)
+    cube = merge_daily_cubes(
+        cube,
+        build_daily_cube(new_sales, products, orders, customers, reviews),
+    )
+    new_facts = build_order_facts(new_items, orders)
+    delivered_orders = append_delivered(delivered_orders,
+                                        filter_delivered(new_facts))
+    return delivered_orders, cube, build_prefix_sums(cube)
+
+
+# ---------------------------------------------------------------------------
+# Partitioned storage
+# ---------------------------------------------------------------------------
+# The delivered fact table (``filter_delivered`` output) can be stored with
+# one Parquet file per purchase month:
+#
+#     <root>/year=2023/month=01/part.parquet
+#     <root>/_partitions.json      manifest: rows and zone maps per partition
+#     <root>/_schema.parquet       zero-row frame carrying the column dtypes
+#
+# A zone map is the min/max of every column in a partition.  Reads consult
+# the manifest and open only partitions whose month and zone maps can match
+# the requested predicates.
+
+PARTITION_MANIFEST = "_partitions.json"
+_PARTITION_SCHEMA = "_schema.parquet"
+_PARTITION_VERSION = 1
+
+
+def _partition_path(year, month):
+    """Relative path of a year/month partition file."""
+    return os.path.join(f"year={year:04d}", f"month={month:02d}",
+                        "part.parquet")
+
+
+def _zone_value(value):
+    """JSON form of a min/max value (timestamps as ISO strings)."""
+    if isinstance(value, pd.Timestamp):
+        return value.isoformat()
+    if isinstance(value, np.generic):
+        return value.item()
+    return value
+
+
+def _column_zone(values):
+    """``[min, max]`` of a column's non-missing values, or None.
+
+    Categorical columns are summarised by the labels that occur; columns
+    without an ordering are skipped.
+    """
+    if isinstance(values.dtype, pd.CategoricalDtype):
+        codes = values.cat.codes.to_numpy()
+        values = pd.Series(
+            values.cat.categories[np.unique(codes[codes >= 0])])
+    values = values.dropna()
+    if values.empty:
+        return None
+    try:
+        return [_zone_value(values.min()), _zone_value(values.max())]
+    except TypeError:
+        return None
+
+
+def write_partitioned(delivered, root):
+    """Store the delivered fact table partitioned by purchase year/month.
+
+    Parameters
+    ----------
+    delivered : pd.DataFrame
+        Output of ``filter_delivered`` (needs ``year`` and ``month``);
+        optionally with ``add_delivery_speed`` / ``enrich_sales`` columns.
+    root : str
+        Directory to write; an existing partitioned table there is
+        replaced as a whole once the new one is complete.
+
+    Returns
+    -------
+    pd.DataFrame
+        The partition statistics, as returned by ``partition_stats``.
+    """
+    tmp_root = root.rstrip(os.sep) + ".tmp"
+    if os.path.isdir(tmp_root):
+        shutil.rmtree(tmp_root)
+    os.makedirs(tmp_root)
+
+    years = delivered["year"].to_numpy()
+    months = delivered["month"].to_numpy()
+    partitions = []
+    for year, month in sorted(set(zip(years.tolist(), months.tolist()))):
+        rows = np.flatnonzero((years == year) & (months == month))
+        purchased = delivered["order_purchase_timestamp"].to_numpy()[rows]
+        part = delivered.take(rows[np.argsort(purchased, kind="stable")])
+        path = _partition_path(year, month)
+        os.makedirs(os.path.dirname(os.path.join(tmp_root, path)))
+        part.to_parquet(os.path.join(tmp_root, path), index=False)
+        partitions.append({
+            "year": year,
+            "month": month,
+            "path": path,
+            "rows": len(part),
+            "zones": {col: _column_zone(part[col]) for col in part.columns},
+        })
+
+    delivered.iloc[:0].to_parquet(os.path.join(tmp_root, _PARTITION_SCHEMA),
+                                  index=False)
+    _write_json(os.path.join(tmp_root, PARTITION_MANIFEST), {
+        "version": _PARTITION_VERSION,
+        "columns": list(delivered.columns),
+        "datetimes": [
+            col for col in delivered.columns
+            if pd.api.types.is_datetime64_any_dtype(delivered[col])
+        ],
+        "partitions": partitions,
+    })
+
+    old_root = root.rstrip(os.sep) + ".old"
+    if os.path.isdir(old_root):
+        shutil.rmtree(old_root)
+    if os.path.isdir(root):
+        os.replace(root, old_root)
+    os.replace(tmp_root, root)
+    if os.path.isdir(old_root):
+        shutil.rmtree(old_root)
+    return partition_stats(root)
+
+
+def _read_manifest(root):
+    """The manifest of a partitioned table, checked for its version."""
+    with open(os.path.join(root, PARTITION_MANIFEST)) as fh:
+        manifest = json.load(fh)
+    if manifest.get("version") != _PARTITION_VERSION:
+        raise ValueError(
+            f"{root} was written by an incompatible version; rewrite it "
+            "with write_partitioned"
+        )
+    return manifest
+
+
+def partition_stats(root):
+    """Row counts and zone maps of a partitioned table.
+
+    Parameters
+    ----------
+    root : str
+        Directory written by ``write_partitioned``.
+
+    Returns
+    -------
+    pd.DataFrame
+        One row per partition, indexed by (year, month), with ``rows`` and
+        ``<column>_min`` / ``<column>_max`` for every column that has an
+        ordering (missing where a partition holds only missing values).
+    """
+    manifest = _read_manifest(root)
+    records = []
+    for part in manifest["partitions"]:
+        record = {"year": part["year"], "month": part["month"],
+                  "rows": part["rows"]}
+        for col, zone in part["zones"].items():
+            if zone is not None:
+                record[f"{col}_min"], record[f"{col}_max"] = zone
+        records.append(record)
+    zone_columns = [f"{col}_{end}" for col in manifest["columns"]
+                    for end in ("min", "max")]
+    stats = pd.DataFrame.from_records(
+        records, columns=["year", "month", "rows"] + zone_columns)
+    empty = [col for col in zone_columns if stats[col].isna().all()]
+    stats = stats.drop(columns=empty).set_index(["year", "month"])
+    for col in manifest["datetimes"]:
+        for name in (f"{col}_min", f"{col}_max"):
+            if name in stats:
+                stats[name] = pd.to_datetime(stats[name])
+    return stats
+
+
+def _zone_overlaps(zone, low, high, is_datetime=False):
+    """Whether a ``[min, max]`` zone can hold values in [low, high].
+
+    Datetime zones are stored as ISO strings and compared as Timestamps.
+    """
+    if zone is None:
+        return False
+    zmin, zmax = zone
+    if is_datetime:
+        zmin, zmax = pd.Timestamp(zmin), pd.Timestamp(zmax)
+    return (low is None or zmax >= low) and (high is None or zmin <= high)
+
+
+def _range_mask(values, low, high):
+    """Boolean mask of the non-missing *values* within [low, high]."""
+    if isinstance(values.dtype, pd.CategoricalDtype):
+        # Compare labels once per category (unordered categoricals do not
+        # support <, >), then map through the codes.
+        codes = values.cat.codes.to_numpy()
+        labels = values.cat.categories
+        inside = np.ones(len(labels) + 1, dtype=bool)
+        inside[-1] = False  # code -1: missing
+        if low is not None:
+            inside[:-1] &= np.asarray(labels >= low)
+        if high is not None:
+            inside[:-1] &= np.asarray(labels <= high)
+        return inside[codes]
+    mask = values.notna().to_numpy(copy=True)
+    if low is not None:
+        mask &= (values >= low).fillna(False).to_numpy(dtype=bool)
+    if high is not None:
+        mask &= (values <= high).fillna(False).to_numpy(dtype=bool)
+    return mask
+
+
+def read_partitioned(root, start_date=None, end_date=None, columns=None,
+                     ranges=None):
+    """Read a partitioned delivered table, opening only matching partitions.
+
+    Parameters
+    ----------
+    root : str
+        Directory written by ``write_partitioned``.
+    start_date, end_date : str or datetime, optional
+        Inclusive purchase-date window, as in ``filter_by_date_range``;
+        either may be None for an open-ended window.
+    columns : list of str, optional
+        Columns to return (all by default).
+    ranges : dict, optional
+        ``{column: (low, high)}`` inclusive value ranges (either bound may
+        be None).  Partitions whose zone map lies outside a range are
+        skipped, and rows outside it (or missing) are dropped.
+
+    Returns
+    -------
+    pd.DataFrame
+        The matching rows in purchase order with a fresh RangeIndex, typed
+        like the frame that was written.
+    """
+    manifest = _read_manifest(root)
+    ranges = {
+        col: tuple(None if bound is None
+                   else pd.Timestamp(bound) if col in manifest["datetimes"]
+                   else bound for bound in bounds)
+        for col, bounds in (ranges or {}).items()
+    }
+    windowed = start_date is not None or end_date is not None
+    if windowed:
+        start = pd.Timestamp(start_date) if start_date is not None else None
+        end, end_inclusive = ((None, True) if end_date is None
+                              else _end_bound(end_date))
+        # Pruning may keep a partition starting exactly at an exclusive end;
+        # the row filter below drops it.
+        ranges_to_prune = dict(ranges, order_purchase_timestamp=(start, end))
+    else:
+        ranges_to_prune = ranges
+
+    output = list(manifest["columns"] if columns is None else columns)
+    needed = list(dict.fromkeys(
+        output + list(ranges)
+        + (["order_purchase_timestamp"] if windowed else [])
+    ))
+    paths = [
+        part["path"] for part in manifest["partitions"]
+        if all(_zone_overlaps(part["zones"][col], low, high,
+                              col in manifest["datetimes"])
+               for col, (low, high) in ranges_to_prune.items())
+    ]
+    # Every partition stores the full categories of the written frame, so
+    # categorical columns concatenate without falling back to object.
+    frames = [pd.read_parquet(os.path.join(root, path), columns=needed)
+              for path in paths]
+    if not frames:
+        typed_from = (manifest["partitions"][0]["path"]
+                      if manifest["partitions"] else _PARTITION_SCHEMA)
+        frames = [pd.read_parquet(os.path.join(root, typed_from),
+                                  columns=needed).iloc[:0]]
+    table = (frames[0] if len(frames) == 1
+             else pd.concat(frames, ignore_index=True))
+
+    # Partitions are written in purchase order, so the window is a slice.
+    if windowed:
+        purchased = table["order_purchase_timestamp"]
+        lo = 0 if start is None else purchased.searchsorted(start, "left")
+        hi = (len(table) if end is None else purchased.searchsorted(
+            end, "right" if end_inclusive else "left"))
+        table = table.iloc[lo:hi]
+    if ranges:
+        keep = np.ones(len(table), dtype=bool)
+        for col, (low, high) in ranges.items():
+            keep &= _range_mask(table[col], low, high)
+        table = table.take(np.flatnonzero(keep))
+    return table[output].reset_index(drop=True)
@@ -0,0 +1,241 @@
+"""
+Lazy query plans over the data_loader / business_metrics pipeline.
+
+``data_loader.scan(data_dir)`` returns a ``Plan`` that only records what
+is asked of it.  Executing it (``.metric(name)`` or ``.collect()``) works
+out what the result needs and runs the eager pipeline once:
+
+- only the tables and columns the result depends on are loaded;
+- status and purchase-date filters are applied to the orders table before
+  it is joined with order items (see ``build_sales_data``);
+- delivery speed and dimension attributes are derived only when used.
+
+The eager functions in ``data_loader`` and ``business_metrics`` remain the
+public building blocks; a plan is a shorthand for chaining them.
+"""
+
+from dataclasses import dataclass, replace
+from typing import Callable, Optional
+
+import pandas as pd
+
+import business_metrics as bm
+import data_loader as dl
+
+
+_DIMENSION_TABLES = ("products", "customers")
+
+# An order can have several distinct review scores, so joining them in
+# repeats its items; they are produced only when asked for by name.
+_DEFAULT_COLUMNS = tuple(column for column in dl.SALES_LINEAGE
+                         if column != "review_score")
+
+
+# ---------------------------------------------------------------------------
+# Metrics
+# ---------------------------------------------------------------------------
+# The sales columns each metric reads are declared next to the metrics, in
+# ``business_metrics.REQUIRED_COLUMNS``.
+
+@dataclass(frozen=True)
+class _Metric:
+    """A business metric and how to feed it."""
+
+    function: Callable
+    # Computed on review_delivery_summary(frame) instead of the frame.
+    on_review_summary: bool = False
+
+    @property
+    def columns(self):
+        return bm.REQUIRED_COLUMNS[self.function.__name__]
+
+
+METRICS = {
+    name: _Metric(getattr(bm, name))
+    for name in ("total_revenue", "monthly_revenue",
+                 "month_over_month_growth", "average_mom_growth",
+                 "total_orders", "average_order_value", "compute_kpis",
+                 "revenue_by_category", "revenue_by_state",
+                 "review_delivery_summary")
+}
+METRICS.update({
+    name: _Metric(getattr(bm, name), on_review_summary=True)
+    for name in ("avg_review_by_delivery_bucket",
+                 "avg_review_by_delivery_day", "review_score_distribution",
+                 "average_delivery_days", "average_review_score")
+})
+
+
+def _lookup_metric(name):
+    try:
+        return METRICS[name]
+    except KeyError:
+        raise ValueError(
+            f"unknown metric {name!r}; available: {sorted(METRICS)}"
+        ) from None
+
+
+# ---------------------------------------------------------------------------
+# Plan
+# ---------------------------------------------------------------------------
+
+@dataclass(frozen=True)
+class Plan:
+    """An immutable, not-yet-executed query over the e-commerce tables.
+
+    Build one with ``data_loader.scan``; every method returns a new plan.
+
+    Attributes
+    ----------
+    data_dir : str
+    use_snapshot : bool
+    statuses : tuple of str, optional
+        Order statuses to keep (None keeps every status).
+    windows : tuple of (start, end)
+        Purchase-date windows, each inclusive as in
+        ``data_loader.filter_by_date_range``; rows must fall in all of them.
+    """
+
+    data_dir: str = "ecommerce_data"
+    use_snapshot: bool = True
+    statuses: Optional[tuple] = None
+    windows: tuple = ()
+
+    # -- building ------------------------------------------------------------
+
+    def status(self, *statuses):
+        """Keep orders with any of *statuses* (intersected with earlier calls)."""
+        if self.statuses is not None:
+            statuses = tuple(s for s in self.statuses if s in statuses)
+        return replace(self, statuses=tuple(statuses))
+
+    def delivered(self):
+        """Keep delivered orders only.
+
+        Rows are then prepared by ``data_loader.filter_delivered`` (sorted
+        by purchase time, with year and month columns).
+        """
+        return self.status("delivered")
+
+    def between(self, start_date, end_date):
+        """Keep purchases from *start_date* to *end_date* inclusive."""
+        return replace(self, windows=self.windows + ((start_date, end_date),))
+
+    # -- optimizing ----------------------------------------------------------
+
+    def explain(self, metric=None, columns=None):
+        """Describe how the plan would run, without running it.
+
+        Parameters
+        ----------
+        metric : str, optional
+            Explain ``.metric(metric)``.
+        columns : list of str, optional
+            Explain ``.collect(columns)`` (ignored when *metric* is given).
+
+        Returns
+        -------
+        str
+        """
+        columns = self._output_columns(metric, columns)
+        lines = [f"scan {self.data_dir}"]
+        for table, cols in dl.source_columns(columns).items():
+            lines.append(f"  read {table}[{', '.join(cols)}]")
+        predicates = []
+        if self.statuses is not None:
+            predicates.append(f"order_status in {list(self.statuses)}")
+        if self.windows:
+            start, end = self.windows[0]
+            predicates.append(f"purchase {start} .. {end}")
+        if predicates:
+            lines.append("  filter orders before join: "
+                         + ", ".join(predicates))
+            lines.append("  inner-join order_items with filtered orders "
+                         "on order_id")
+        else:
+            lines.append("  inner-join order_items with orders on order_id")
+        for start, end in self.windows[1:]:
+            lines.append(f"  filter purchase {start} .. {end}")
+        lines.append(f"  project [{', '.join(columns)}]")
+        if metric is not None:
+            lines.append(f"  metric {metric}")
+        return "\n".join(lines)
+
+    def _output_columns(self, metric, columns):
+        if metric is not None:
+            return list(_lookup_metric(metric).columns)
+        if columns is None:
+            return list(_DEFAULT_COLUMNS)
+        return list(columns)
+
+    # -- executing -----------------------------------------------------------
+
+    def collect(self, columns=None):
+        """Execute the plan and return the filtered sales rows.
+
+        Parameters
+        ----------
+        columns : list of str, optional
+            Columns to produce (keys of ``data_loader.SALES_LINEAGE``); only
+            the table columns they need are read.  None produces every
+            column except ``review_score``.
+
+        Returns
+        -------
+        pd.DataFrame
+            One row per order item, projected to *columns*.  Asking for
+            ``review_score`` gives one row per item and distinct score of
+            its order instead.
+        """
+        columns = self._output_columns(None, columns)
+        reads = dl.source_columns(columns)
+        datasets = dl.load_datasets(self.data_dir,
+                                    use_snapshot=self.use_snapshot,
+                                    columns=reads)
+
+        orders = dl.parse_order_dates(datasets["orders"])
+        start, end = self.windows[0] if self.windows else (None, None)
+        sales = dl.build_sales_data(datasets["order_items"], orders,
+                                    status=self.statuses,
+                                    start_date=start, end_date=end)
+        if self.statuses == ("delivered",):
+            sales = dl.filter_delivered(sales)
+        elif "year" in columns or "month" in columns:
+            purchased = sales["order_purchase_timestamp"].dt
+            sales = sales.assign(year=purchased.year, month=purchased.month)
+        for start, end in self.windows[1:]:
+            sales = dl.filter_by_date_range(sales, start, end)
+        if "delivery_days" in columns:
+            sales = dl.add_delivery_speed(sales)
+        if any(table in reads for table in _DIMENSION_TABLES):
+            missing = pd.DataFrame()
+            sales = dl.enrich_sales(
+                sales, datasets.get("products", missing), orders,
+                datasets.get("customers", missing),
+            )
+        if "review_score" in columns:
+            # One row per distinct (order, score): fine for review
+            # metrics, but it repeats items of orders with several scores.
+            sales = sales.merge(dl.distinct_reviews(datasets["reviews"]),
+                                on="order_id", how="left")
+        return sales[columns]
+
+    def metric(self, name, **kwargs):
+        """Execute the plan and compute one business metric on the result.
+
+        Parameters
+        ----------
+        name : str
+            A key of ``METRICS`` (the ``business_metrics`` function name).
+        **kwargs
+            Extra arguments for the metric, e.g. ``top_k``.
+
+        Returns
+        -------
+        Whatever the ``business_metrics`` function returns.
+        """
+        spec = _lookup_metric(name)
+        frame = self.collect(list(spec.columns))
+        if spec.on_review_summary:
+            frame = bm.review_delivery_summary(frame)
+        return spec.function(frame, **kwargs)
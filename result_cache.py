@@ -0,0 +1,180 @@
+"""
+Size-bounded LRU cache for computed results.
+
+The dashboard keeps one ``ResultCache`` per process (shared by every
+session) for the data behind each panel, keyed by panel, date range and
+data version.  Revisiting a range, or another user viewing the same range,
+is then a dictionary lookup instead of a recomputation.
+
+Entries are sized with ``estimate_nbytes`` and the least recently used ones
+are evicted once the total exceeds the budget.  Cached values are handed
+to every caller as they are, so treat them as read-only (the dashboard
+freezes its frames with ``data_loader.freeze_frame`` before caching).
+"""
+
+import sys
+import threading
+from collections import OrderedDict
+from collections.abc import Mapping
+from concurrent.futures import Future
+
+import numpy as np
+import pandas as pd
+
+
+_MISSING = object()
+
+
+# ---------------------------------------------------------------------------
+# Sizing
+# ---------------------------------------------------------------------------
+
+def estimate_nbytes(value):
+    """Approximate memory held by *value*, in bytes.
+
+    DataFrames and Series are measured with ``memory_usage(deep=True)``
+    (index included), arrays by ``nbytes``; tuples, lists and mappings
+    (including read-only ``MappingProxyType`` views) add up their items.
+    Anything else counts as ``sys.getsizeof``.
+
+    Parameters
+    ----------
+    value : object
+
+    Returns
+    -------
+    int
+    """
+    if isinstance(value, pd.DataFrame):
+        return int(value.memory_usage(deep=True, index=True).sum())
+    if isinstance(value, pd.Series):
+        return int(value.memory_usage(deep=True, index=True))
+    if isinstance(value, np.ndarray):
+        return int(value.nbytes)
+    if isinstance(value, (tuple, list)):
+        return sys.getsizeof(value) + sum(estimate_nbytes(v) for v in value)
+    if isinstance(value, Mapping):
+        return sys.getsizeof(value) + sum(
+            estimate_nbytes(k) + estimate_nbytes(v) for k, v in value.items()
+        )
+    return sys.getsizeof(value)
+
+
+# ---------------------------------------------------------------------------
+# Cache
+# ---------------------------------------------------------------------------
+
+class ResultCache:
+    """Thread-safe LRU cache bounded by the estimated size of its values.
+
+    Parameters
+    ----------
+    max_bytes : int
+        Memory budget.  Least recently used entries are evicted to stay
+        within it; a single value larger than the budget is returned but
+        not cached.
+
+    Attributes
+    ----------
+    hits, misses, evictions : int
+        Counters since construction (or the last ``clear``).
+    """
+
+    def __init__(self, max_bytes):
+        if max_bytes < 0:
+            raise ValueError(f"max_bytes must be >= 0, got {max_bytes}")
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()  # key -> (value, nbytes)
+        self._pending = {}  # key -> Future of a computation in progress
+        self._nbytes = 0
+        self._lock = threading.RLock()
+        self.hits = self.misses = self.evictions = 0
+
+    @property
+    def nbytes(self):
+        """Estimated size of everything currently cached."""
+        return self._nbytes
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, key):
+        return key in self._entries
+
+    def get(self, key, default=None):
+        """The value cached under *key* (marking it recently used)."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return default
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, key, value):
+        """Cache *value* under *key*, evicting old entries to fit."""
+        nbytes = estimate_nbytes(value)
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._nbytes -= old[1]
+            if nbytes > self.max_bytes:
+                return
+            self._entries[key] = (value, nbytes)
+            self._nbytes += nbytes
+            while self._nbytes > self.max_bytes:
+                _, (_, evicted) = self._entries.popitem(last=False)
+                self._nbytes -= evicted
+                self.evictions += 1
+
+    def get_or_compute(self, key, compute):
+        """The value under *key*, computing and caching it on a miss.
+
+        Parameters
+        ----------
+        key : hashable
+        compute : callable
+            Called without arguments on a miss.  It runs outside the lock,
+            once per key: callers missing a key that is already being
+            computed wait for that result (and count as hits) instead of
+            computing it again.  If *compute* raises, every waiting caller
+            gets the exception and nothing is cached.
+
+        Returns
+        -------
+        object
+        """
+        with self._lock:
+            value = self.get(key, _MISSING)
+            if value is not _MISSING:
+                return value
+            pending = self._pending.get(key)
+            if pending is None:
+                pending = self._pending[key] = Future()
+                computing = True
+            else:
+                self.misses -= 1
+                self.hits += 1
+                computing = False
+        if not computing:
+            return pending.result()
+        try:
+            value = compute()
+            self.put(key, value)
+        except BaseException as exc:
+            pending.set_exception(exc)
+            raise
+        else:
+            pending.set_result(value)
+        finally:
+            with self._lock:
+                del self._pending[key]
+        return value
+
+    def clear(self):
+        """Drop every entry and reset the counters."""
+        with self._lock:
+            self._entries.clear()
+            self._nbytes = 0
+            self.hits = self.misses = self.evictions = 0
@@ -0,0 +1,330 @@
+"""
+Out-of-core KPI aggregation over chunked CSV reads.
+
+``stream_kpis`` computes the headline business metrics for a status and
+date window without loading any table whole.  Tables are read with
+``data_loader.read_table_chunks`` and folded into a ``KpiAccumulator``:
+
+1. orders are filtered chunk by chunk; only the matching orders are kept,
+   reduced to their key, purchase month and delivery days;
+2. customers and products are streamed to look up each kept order's state
+   and each product's category;
+3. order items are streamed and summed into running totals;
+4. reviews are streamed and reduced to distinct (order, score) pairs.
+
+Memory is the chunk size plus state that grows with the matching orders
+and the product catalogue: a few integers per order and per product, since
+IDs are kept as 64-bit hashes and states and categories as integer codes
+rather than Python strings.  An open window therefore still holds one
+small row per order; only the raw tables are never loaded whole.
+Results equal the in-memory ``business_metrics`` path up to float
+summation order.
+"""
+
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+import aggregation as agg
+import business_metrics as bm
+import data_loader as dl
+
+
+DEFAULT_CHUNKSIZE = 100_000
+
+
+# ---------------------------------------------------------------------------
+# Results
+# ---------------------------------------------------------------------------
+
+@dataclass(frozen=True)
+class StreamedKpis:
+    """Business metrics produced by ``KpiAccumulator.result``.
+
+    Each field matches the ``business_metrics`` function of the same name
+    applied to the in-memory delivered data for the same window (review
+    and delivery averages as computed from ``review_delivery_summary``).
+    """
+
+    total_revenue: float
+    total_orders: int
+    average_order_value: float
+    monthly_revenue: pd.DataFrame
+    average_mom_growth: float
+    revenue_by_category: pd.Series
+    revenue_by_state: pd.DataFrame
+    average_review_score: float
+    average_delivery_days: float
+    review_count: int
+
+
+# ---------------------------------------------------------------------------
+# Accumulator
+# ---------------------------------------------------------------------------
+
+def _id_keys(values):
+    """64-bit hashes of an ID column (collisions are vanishingly unlikely)."""
+    return pd.util.hash_pandas_object(values, index=False).to_numpy()
+
+
+class _Labels:
+    """Integer codes for a growing set of text labels (states, categories)."""
+
+    def __init__(self):
+        self._index = pd.Index([], dtype=object)
+
+    def encode(self, values):
+        """Codes of *values*, -1 for missing ones."""
+        values = pd.Categorical(values.astype(object))
+        new = values.categories.difference(self._index)
+        if len(new):
+            self._index = self._index.append(pd.Index(new, dtype=object))
+        mapping = self._index.get_indexer(values.categories)
+        codes = values.codes
+        return np.where(codes >= 0, mapping[codes], -1).astype(np.int32)
+
+    def decode(self, codes):
+        """Categorical of the labels behind *codes*."""
+        labels = self._index.to_numpy(dtype=object)
+        return pd.Categorical(np.where(codes >= 0, labels[codes], None))
+
+
+def _add(total, part):
+    """Running per-label sum; *total* may be None."""
+    if total is None:
+        return part
+    return total.add(part, fill_value=0)
+
+
+class KpiAccumulator:
+    """Incremental aggregation of KPIs over streamed table chunks.
+
+    Feed it in dependency order -- ``add_orders`` for every orders chunk,
+    then ``add_customers``, ``add_products``, ``add_items`` and finally
+    ``add_reviews`` -- and call ``result`` at the end.  ``stream_kpis``
+    does this for the CSV files of a data directory.
+
+    Parameters
+    ----------
+    status : str or list of str, optional
+        Order statuses to include (default: delivered orders).
+    start_date, end_date : str or datetime, optional
+        Inclusive purchase-date window, as in
+        ``data_loader.filter_by_date_range``.
+    """
+
+    def __init__(self, status="delivered", start_date=None, end_date=None):
+        self.status = status
+        self.start_date = start_date
+        self.end_date = end_date
+        self._order_parts = []
+        self._orders = None
+        self._order_index = None
+        self._customer_keys = None
+        self._state_codes = None
+        self._states = _Labels()
+        self._product_parts = []
+        self._product_index = None
+        self._category_codes = None
+        self._categories = _Labels()
+        self._has_items = None
+        self._revenue = 0.0
+        self._monthly = None
+        self._by_category = None
+        self._by_state = None
+        self._review_keys = []
+
+    # -- dimensions ----------------------------------------------------------
+
+    def add_orders(self, chunk):
+        """Keep the orders of *chunk* that match the status and window."""
+        orders = dl.filter_orders(chunk, self.status, self.start_date,
+                                  self.end_date)
+        purchased = orders["order_purchase_timestamp"]
+        self._order_parts.append(pd.DataFrame({
+            "order_key": _id_keys(orders["order_id"]),
+            "customer_key": _id_keys(orders["customer_id"]),
+            "year": purchased.dt.year.to_numpy(),
+            "month": purchased.dt.month.to_numpy(),
+            "delivery_days": (
+                orders["order_delivered_customer_date"] - purchased
+            ).dt.days.to_numpy(dtype=np.float32),
+        }))
+
+    def _finish_orders(self):
+        if self._orders is not None:
+            return
+        self._orders = pd.concat(self._order_parts, ignore_index=True)
+        self._order_parts = []
+        self._order_index = pd.Index(self._orders.pop("order_key"))
+        self._customer_keys = self._orders.pop("customer_key").to_numpy()
+        self._state_codes = np.full(len(self._orders), -1, dtype=np.int32)
+        self._has_items = np.zeros(len(self._orders), dtype=bool)
+
+    def add_customers(self, chunk):
+        """Record the state of the customers behind the kept orders."""
+        self._finish_orders()
+        keys = pd.Index(_id_keys(chunk["customer_id"]))
+        unique = ~keys.duplicated(keep="last")
+        codes = self._states.encode(chunk["customer_state"])[unique]
+        found = keys[unique].get_indexer(self._customer_keys)
+        hit = found >= 0
+        self._state_codes[hit] = codes[found[hit]]
+
+    def add_products(self, chunk):
+        """Record the category of every product in *chunk*.
+
+        A product listed more than once keeps its first category.
+        """
+        self._product_parts.append(pd.DataFrame({
+            "product_key": _id_keys(chunk["product_id"]),
+            "category": self._categories.encode(
+                chunk["product_category_name"]),
+        }))
+
+    def _finish_products(self):
+        if self._product_index is not None:
+            return
+        products = (pd.concat(self._product_parts, ignore_index=True)
+                    if self._product_parts else
+                    pd.DataFrame({"product_key": np.array([], np.uint64),
+                                  "category": np.array([], np.int32)}))
+        self._product_parts = []
+        products = products[~products["product_key"].duplicated()]
+        self._product_index = pd.Index(products["product_key"])
+        self._category_codes = products["category"].to_numpy()
+
+    # -- facts ---------------------------------------------------------------
+
+    def add_items(self, chunk):
+        """Fold the items of kept orders in *chunk* into the running totals."""
+        self._finish_orders()
+        self._finish_products()
+        position = self._order_index.get_indexer(_id_keys(chunk["order_id"]))
+        matched = position >= 0
+        position = position[matched]
+        price = pd.Series(chunk["price"].to_numpy()[matched])
+        self._has_items[position] = True
+        self._revenue += float(price.sum())
+
+        orders = self._orders
+        self._monthly = _add(self._monthly, agg.group_sum(
+            [pd.Series(orders["year"].to_numpy()[position], name="year"),
+             pd.Series(orders["month"].to_numpy()[position], name="month")],
+            price,
+        ))
+        found = self._product_index.get_indexer(
+            _id_keys(chunk["product_id"])[matched])
+        category = np.where(found >= 0, self._category_codes[found], -1)
+        self._by_category = _add(self._by_category, agg.group_sum(
+            pd.Series(self._categories.decode(category),
+                      name="product_category_name"), price))
+        self._by_state = _add(self._by_state, agg.group_sum(
+            pd.Series(self._states.decode(self._state_codes[position]),
+                      name="customer_state"), price))
+
+    def add_reviews(self, chunk):
+        """Collect distinct review scores of kept orders that have items."""
+        self._finish_orders()
+        position = self._order_index.get_indexer(_id_keys(chunk["order_id"]))
+        keep = position >= 0
+        keep[keep] = self._has_items[position[keep]]
+        scores = chunk["review_score"].to_numpy()[keep]
+        self._review_keys.append(pd.DataFrame(
+            {"position": position[keep], "review_score": scores}
+        ).drop_duplicates())
+
+    # -- result --------------------------------------------------------------
+
+    def result(self):
+        """The KPIs of everything added so far.
+
+        Returns
+        -------
+        StreamedKpis
+        """
+        self._finish_orders()
+        n_orders = int(self._has_items.sum())
+        revenue = self._revenue
+
+        monthly = self._monthly
+        if monthly is None:
+            monthly = pd.Series(
+                [], dtype="float64", name="price",
+                index=pd.MultiIndex.from_arrays([[], []],
+                                                names=["year", "month"]))
+        monthly = monthly.sort_index().rename("revenue").reset_index()
+        by_category = (self._by_category if self._by_category is not None
+                       else pd.Series([], dtype="float64"))
+        by_state = (self._by_state if self._by_state is not None
+                    else pd.Series([], dtype="float64"))
+
+        reviews = (pd.concat(self._review_keys, ignore_index=True)
+                   .drop_duplicates()
+                   if self._review_keys else
+                   pd.DataFrame({"position": [], "review_score": []}))
+        days = pd.Series(
+            self._orders["delivery_days"].to_numpy()[
+                reviews["position"].to_numpy(dtype=np.intp)],
+            dtype="float64",
+        )
+        return StreamedKpis(
+            total_revenue=revenue,
+            total_orders=n_orders,
+            average_order_value=(revenue / n_orders if n_orders
+                                 else float("nan")),
+            monthly_revenue=monthly,
+            # Like business_metrics.average_mom_growth: by calendar month.
+            average_mom_growth=float(
+                monthly.groupby("month")["revenue"].sum().pct_change().mean()
+            ),
+            revenue_by_category=bm.rank_descending(
+                by_category.rename("price")),
+            revenue_by_state=(bm.rank_descending(by_state)
+                              .rename("revenue").reset_index()),
+            average_review_score=float(reviews["review_score"].mean()),
+            average_delivery_days=float(days.mean()),
+            review_count=len(reviews),
+        )
+
+
+# ---------------------------------------------------------------------------
+# Driver
+# ---------------------------------------------------------------------------
+
+def stream_kpis(data_dir="ecommerce_data", start_date=None, end_date=None,
+                status="delivered", chunksize=DEFAULT_CHUNKSIZE):
+    """Compute KPIs for a window by streaming the CSVs in bounded chunks.
+
+    Parameters
+    ----------
+    data_dir : str
+    start_date, end_date : str or datetime, optional
+        Inclusive purchase-date window; None leaves that side open.
+    status : str or list of str, optional
+        Order statuses to include.
+    chunksize : int
+        Rows read per chunk.
+
+    Returns
+    -------
+    StreamedKpis
+    """
+    accumulator = KpiAccumulator(status, start_date, end_date)
+    feeds = [
+        ("orders", accumulator.add_orders,
+         ["order_id", "customer_id", "order_status",
+          "order_purchase_timestamp", "order_delivered_customer_date"]),
+        ("customers", accumulator.add_customers,
+         ["customer_id", "customer_state"]),
+        ("products", accumulator.add_products,
+         ["product_id", "product_category_name"]),
+        ("order_items", accumulator.add_items,
+         ["order_id", "product_id", "price"]),
+        ("reviews", accumulator.add_reviews, ["order_id", "review_score"]),
+    ]
+    for name, add, columns in feeds:
+        for chunk in dl.read_table_chunks(data_dir, name, chunksize, columns):
+            add(chunk)
+    return accumulator.result()
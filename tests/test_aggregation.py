@@ -0,0 +1,81 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import aggregation as agg
+
+
+@pytest.fixture
+def frame():
+    rng = np.random.default_rng(0)
+    n = 500
+    values = rng.normal(100, 30, n)
+    values[rng.random(n) < 0.05] = np.nan
+    category = pd.Categorical(
+        rng.choice(["b", "a", "d", None], n),
+        categories=["a", "b", "c", "d"],  # "c" never occurs
+    )
+    return pd.DataFrame({
+        "category": category,
+        "year": rng.integers(2021, 2024, n),
+        "month": rng.integers(1, 13, n),
+        "days": rng.integers(0, 40, n),
+        "sparse": rng.choice([0, 10**9], n),
+        "label": rng.choice(["x", "y", "z"], n),
+        "value": values,
+    })
+
+
+def _expected(frame, keys, how):
+    grouped = frame.groupby(keys, observed=True)
+    return grouped.size() if how == "size" else getattr(grouped["value"],
+                                                        how)()
+
+
+@pytest.mark.parametrize("keys", [
+    ["category"], ["year"], ["days"], ["year", "month"],
+    ["category", "month"], ["sparse"], ["label"],
+])
+@pytest.mark.parametrize("how", ["sum", "mean", "size"])
+def test_matches_groupby(frame, keys, how):
+    key_columns = [frame[key] for key in keys]
+    if len(key_columns) == 1:
+        key_columns = key_columns[0]
+    if how == "size":
+        result = agg.group_size(key_columns)
+    else:
+        result = getattr(agg, f"group_{how}")(key_columns, frame["value"])
+    expected = _expected(frame, keys, how)
+    pd.testing.assert_series_equal(result, expected, check_names=False,
+                                   check_dtype=False, rtol=1e-12)
+    assert list(result.index.names) == keys
+
+
+def test_categorical_keys_keep_categorical_index(frame):
+    result = agg.group_sum(frame["category"], frame["value"])
+    assert isinstance(result.index, pd.CategoricalIndex)
+    assert list(result.index) == ["a", "b", "d"]
+
+
+def test_all_missing_group_mean_is_nan():
+    keys = pd.Series([1, 1, 2], name="key")
+    values = pd.Series([np.nan, np.nan, 3.0], name="value")
+    result = agg.group_mean(keys, values)
+    assert np.isnan(result.loc[1])
+    assert result.loc[2] == 3.0
+
+
+def test_empty_input():
+    keys = pd.Series([], dtype="int64", name="key")
+    values = pd.Series([], dtype="float64", name="value")
+    sums = agg.group_sum(keys, values)
+    assert len(sums) == 0 and sums.dtype == "float64"
+    assert len(agg.group_size(keys)) == 0
+
+
+def test_dense_codes():
+    codes, labels = agg.dense_codes(pd.Series([5, 7, 5]))
+    assert codes.tolist() == [0, 2, 0]
+    assert labels.tolist() == [5, 6, 7]
+    assert agg.dense_codes(pd.Series(["a", "b"])) is None
+    assert agg.dense_codes(pd.Series([0, 10**9])) is None
@@ -0,0 +1,177 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import business_metrics as bm
+import data_loader as dl
+
+
+@pytest.fixture
+def tables():
+    """Three delivered orders, one of them reviewed twice with two scores."""
+    orders = pd.DataFrame({
+        "order_id": ["a", "b", "c", "d"],
+        "customer_id": ["c1", "c2", "c1", "c3"],
+        "order_status": ["delivered", "delivered", "delivered", "canceled"],
+        "order_purchase_timestamp": ["2023-01-05 10:00:00",
+                                     "2023-02-10 09:30:00",
+                                     "2023-03-01 18:00:00",
+                                     "2023-03-02 12:00:00"],
+        "order_delivered_customer_date": ["2023-01-08 12:00:00",
+                                          "2023-02-25 15:00:00",
+                                          "2023-03-09 08:00:00", None],
+    })
+    order_items = pd.DataFrame({
+        "order_id": ["a", "a", "b", "c", "c", "c", "d"],
+        "product_id": ["p1", "p2", "p1", "p3", "p3", "p2", "p1"],
+        "price": [10.0, 25.5, 40.0, 5.0, 5.0, 99.9, 12.0],
+        "freight_value": [1.0, 2.0, 3.0, 0.5, 0.5, 4.0, 1.0],
+    })
+    reviews = pd.DataFrame({
+        "review_id": ["r1", "r2", "r3", "r4", "r5"],
+        # "a" has two distinct scores, "c" the same score twice.
+        "order_id": ["a", "a", "b", "c", "c"],
+        "review_score": [5, 2, 4, 3, 3],
+    })
+    return dl.parse_order_dates(orders), order_items, reviews
+
+
+@pytest.fixture
+def both_grains(tables):
+    orders, order_items, _ = tables
+    items = dl.add_delivery_speed(
+        dl.filter_delivered(dl.build_sales_data(order_items, orders)))
+    facts = dl.filter_delivered(dl.build_order_facts(order_items, orders))
+    return items, facts
+
+
+@pytest.mark.parametrize("metric", [
+    "total_revenue", "total_orders", "average_order_value",
+    "average_mom_growth",
+])
+def test_order_facts_match_item_rows(both_grains, metric):
+    items, facts = both_grains
+    function = getattr(bm, metric)
+    assert function(facts, order_level=True) == pytest.approx(
+        function(items), nan_ok=True)
+
+
+def test_monthly_revenue_and_kpis_match(both_grains):
+    items, facts = both_grains
+    pd.testing.assert_frame_equal(bm.monthly_revenue(facts, order_level=True),
+                                  bm.monthly_revenue(items))
+    assert bm.compute_kpis(facts, order_level=True) == bm.compute_kpis(items)
+
+
+def test_review_summary_keeps_distinct_scores(tables, both_grains):
+    orders, order_items, reviews = tables
+    items, facts = both_grains
+    key = ["order_id", "review_score"]
+    from_items = bm.review_delivery_summary(items, reviews)
+    from_facts = bm.review_delivery_summary(facts, reviews)
+    scored = items.merge(dl.distinct_reviews(reviews), on="order_id",
+                         how="left")
+    from_scored = bm.review_delivery_summary(scored)
+
+    expected = [("a", 2), ("a", 5), ("b", 4), ("c", 3)]
+    for summary in (from_items, from_facts, from_scored):
+        pairs = summary.sort_values(key)[key]
+        assert list(pairs.itertuples(index=False, name=None)) == expected
+
+    assert bm.average_review_score(from_facts) == pytest.approx(3.5)
+    distribution = bm.review_score_distribution(from_facts)
+    assert np.issubdtype(distribution.index.dtype, np.integer)
+
+
+def test_cube_counts_the_same_reviews(tables):
+    orders, order_items, reviews = tables
+    products = pd.DataFrame({"product_id": ["p1", "p2", "p3"],
+                             "product_category_name": ["x", "y", "x"]})
+    customers = pd.DataFrame({"customer_id": ["c1", "c2", "c3"],
+                              "customer_state": ["CA", "NY", "TX"]})
+    cube = dl.build_daily_cube(dl.build_sales_data(order_items, orders),
+                               products, orders, customers, reviews)
+    delivered = cube[cube["order_status"] == "delivered"]
+    assert bm.cube_review_count(delivered) == 4
+    assert bm.cube_average_review_score(delivered) == pytest.approx(3.5)
+
+
+def _bucket_for(days, edges, labels):
+    """Scalar rule in the style of ``categorize_delivery_speed``."""
+    for edge, label in zip(edges, labels):
+        if days <= edge:
+            return label
+    return labels[-1]
+
+
+@pytest.mark.parametrize("scheme", sorted(bm.DELIVERY_BUCKET_SCHEMES))
+def test_bucket_delivery_days_matches_scalar_rule(scheme):
+    edges, labels = bm.DELIVERY_BUCKET_SCHEMES[scheme]
+    values = [-5.0, -0.5, 0.0, 1.0, 3.0, 3.5, 7.0, 7.5, 8.0]
+    values += [float(edge + offset) for edge in edges for offset in (0, 1)]
+    days = pd.Series(values + [np.nan])
+
+    buckets = bm.bucket_delivery_days(days, edges, labels)
+    expected = [_bucket_for(value, edges, labels) for value in values]
+    assert buckets.iloc[:-1].tolist() == expected
+    assert pd.isna(buckets.iloc[-1])
+    if scheme == "speed":
+        assert expected == [bm.categorize_delivery_speed(value)
+                            for value in values]
+        assert bm.bucket_delivery_days(days).equals(buckets)
+
+    labelled = bm.bucket_delivery_days(days, edges, labels,
+                                       missing_label="unknown")
+    assert labelled.tolist() == expected + ["unknown"]
+
+
+@pytest.fixture
+def category_totals():
+    # Ties at 5.0 straddle k=2 and k=3, and at 1.0 the end of the list.
+    return pd.Series([1.0, 5.0, 7.5, 5.0, 5.0, 1.0, 0.0],
+                     index=pd.Index(list("abcdefg"),
+                                    name="product_category_name"),
+                     name="price")
+
+
+@pytest.mark.parametrize("top_k", range(0, 10))
+def test_rank_descending_matches_a_stable_sort(category_totals, top_k):
+    expected = category_totals.sort_values(ascending=False, kind="stable")
+    ranked = bm.rank_descending(category_totals, top_k)
+    pd.testing.assert_series_equal(ranked, expected.head(top_k))
+
+
+@pytest.mark.parametrize("top_k", range(0, 10))
+def test_other_row_keeps_the_total(category_totals, top_k):
+    ranked = bm.rank_descending(category_totals, top_k, other_label="Other")
+    n_kept = min(top_k, len(category_totals))
+    kept = category_totals.sort_values(ascending=False,
+                                       kind="stable").head(n_kept)
+    pd.testing.assert_series_equal(ranked.iloc[:n_kept], kept)
+    assert ranked.sum() == pytest.approx(category_totals.sum())
+    if top_k >= len(category_totals):
+        assert "Other" not in ranked.index
+    else:
+        assert list(ranked.index[n_kept:]) == ["Other"]
+        assert ranked["Other"] == pytest.approx(
+            category_totals.drop(kept.index).sum())
+    assert ranked.name == "price"
+    assert ranked.index.name == "product_category_name"
+
+
+def test_rank_descending_rejects_negative_k(category_totals):
+    with pytest.raises(ValueError):
+        bm.rank_descending(category_totals, -1)
+
+
+def test_top_k_breakdown_keeps_revenue(tables, both_grains):
+    orders, _, _ = tables
+    items, _ = both_grains
+    customers = pd.DataFrame({"customer_id": ["c1", "c2", "c3"],
+                              "customer_state": ["CA", "NY", "TX"]})
+    full = bm.revenue_by_state(items, orders, customers)
+    top = bm.revenue_by_state(items, orders, customers, top_k=1,
+                              other_label="Other")
+    assert list(top["customer_state"]) == [full["customer_state"].iloc[0],
+                                           "Other"]
+    assert top["revenue"].sum() == pytest.approx(bm.total_revenue(items))
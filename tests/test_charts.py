@@ -0,0 +1,36 @@
+import sys
+import types
+
+import pandas as pd
+import plotly.io as pio
+import pytest
+
+import charts
+
+
+@pytest.fixture
+def script_main(tmp_path, monkeypatch):
+    """A ``__main__`` like Streamlit's: spec-less, run from a script path."""
+    script = tmp_path / "dashboard.py"
+    script.write_text("raise SystemExit('workers must not run the script')\n")
+    main = types.ModuleType("__main__")
+    main.__file__ = str(script)
+    monkeypatch.setitem(sys.modules, "__main__", main)
+    return main
+
+
+def test_pool_workers_do_not_run_the_main_script(script_main, monkeypatch):
+    monkeypatch.setattr(pio.templates, "default", pio.templates.default)
+    template = pio.templates["plotly_white"].to_plotly_json()
+    state_revenue = pd.DataFrame({"customer_state": ["CA", "NY"],
+                                  "revenue": [10.0, 5.0]})
+    pool = charts.start_pool(2, template)
+    try:
+        spec = pool.submit(charts.state_revenue_map, state_revenue).result(60)
+    finally:
+        pool.shutdown()
+    assert sys.modules["__main__"] is script_main
+
+    charts.use_template(template)
+    assert pio.to_json(spec) == pio.to_json(
+        charts.state_revenue_map(state_revenue))
@@ -0,0 +1,140 @@
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import data_loader as dl
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.dirname(
+    os.path.abspath(__file__))), "ecommerce_data")
+
+
+@pytest.fixture(scope="module", autouse=True)
+def copy_on_write():
+    dl.enable_copy_on_write()
+    assert dl.copy_on_write_enabled()
+
+
+@pytest.fixture(scope="module")
+def datasets():
+    return dl.load_datasets(DATA_DIR, use_snapshot=False,
+                            tables=["orders", "order_items"])
+
+
+def _buffers(values):
+    """The memory behind a column: arrays, or Arrow buffer addresses."""
+    array = values.array
+    if isinstance(array, pd.Categorical):
+        return array.codes
+    if hasattr(array, "__arrow_array__"):
+        return {buffer.address for chunk in array.__arrow_array__().chunks
+                for buffer in chunk.buffers() if buffer is not None}
+    return values.to_numpy()
+
+
+def _shares(left, right, column):
+    """True if *column* of both frames is backed by the same memory."""
+    old, new = _buffers(left[column]), _buffers(right[column])
+    if isinstance(old, set):
+        return bool(old & new)
+    return np.shares_memory(old, new)
+
+
+def test_parse_order_dates_shares_unchanged_columns(datasets):
+    orders = datasets["orders"]
+    parsed = dl.parse_order_dates(orders)
+    # Dates are already parsed by load_datasets, so nothing is rebuilt.
+    for column in dl._ORDER_DATE_COLS:
+        assert _shares(orders, parsed, column)
+
+
+def test_load_path_copies_only_selected_rows(datasets):
+    orders = dl.parse_order_dates(datasets["orders"])
+    sales = dl.build_sales_data(datasets["order_items"], orders)
+    before = sales.copy(deep=True)
+
+    delivered = dl.filter_delivered(sales)
+    with_speed = dl.add_delivery_speed(delivered)
+    in_range = dl.filter_by_date_range(with_speed, "2023-01-01",
+                                       "2023-12-31")
+    in_year = dl.filter_by_year(with_speed, 2023)
+
+    # add_delivery_speed adds one column and shares every other one.
+    for column in delivered.columns:
+        assert _shares(delivered, with_speed, column), column
+    # Range filters on the time-sorted frame are positional slices.
+    for column in with_speed.columns:
+        assert _shares(with_speed, in_range, column), column
+        assert _shares(with_speed, in_year, column), column
+    assert len(in_range) == len(in_year) > 0
+    # No step modifies its input.
+    assert sales.equals(before)
+
+
+def test_writes_do_not_leak_into_shared_columns(datasets):
+    orders = dl.parse_order_dates(datasets["orders"])
+    sales = dl.build_sales_data(datasets["order_items"], orders)
+    delivered = dl.add_delivery_speed(dl.filter_delivered(sales))
+    in_range = dl.filter_by_date_range(delivered, "2023-01-01", "2023-12-31")
+    original = float(delivered["price"].iloc[in_range.index[0]])
+
+    in_range.loc[in_range.index[0], "price"] = -1.0
+    assert float(delivered["price"].iloc[in_range.index[0]]) == original
+
+
+@pytest.fixture
+def shared(datasets):
+    orders = dl.parse_order_dates(datasets["orders"])
+    delivered = dl.filter_delivered(
+        dl.build_sales_data(datasets["order_items"], orders))
+    return delivered, dl.SharedTables((delivered, np.arange(3)))
+
+
+@pytest.mark.parametrize("change", [
+    lambda frame: frame.__setitem__("extra", 1),
+    lambda frame: frame.__setitem__("price", frame["price"] * 2),
+    lambda frame: frame.__delitem__("month"),
+    lambda frame: setattr(frame, "index", frame.index + 1),
+], ids=["add-column", "replace-column", "drop-column", "replace-index"])
+def test_shared_tables_report_changed_frames(shared, change):
+    source, tables = shared
+    columns = list(source.columns)
+    frame, _ = tables
+    change(frame)
+    with pytest.raises(dl.SharedTablesModified):
+        frame, _ = tables
+    with pytest.raises(dl.SharedTablesModified):
+        tables.verify()
+    assert list(source.columns) == columns
+
+
+@pytest.mark.parametrize("column, value", [
+    ("price", -1.0),
+    ("year", 1999),
+    ("order_status", "canceled"),
+    # pandas reports the read-only datetime buffer as an AssertionError.
+    ("order_purchase_timestamp", pd.Timestamp("2000-01-01")),
+])
+def test_loc_writes_to_frozen_columns_raise(shared, column, value):
+    source, tables = shared
+    frame, array = tables
+    before = source[column].iloc[0]
+    with pytest.raises((ValueError, AssertionError)):
+        frame.loc[frame.index[0], column] = value
+    with pytest.raises(ValueError):
+        array[0] = 1
+    assert source[column].iloc[0] == before
+    frame, _ = tables  # still unmodified
+
+
+def test_arrow_writes_stay_out_of_the_source(shared):
+    source, tables = shared
+    frame, _ = tables
+    before = source["order_id"].iloc[0]
+    # Arrow buffers are immutable: the write swaps the frozen column's
+    # buffers, which the next unpack reports.
+    frame.loc[frame.index[0], "order_id"] = "changed"
+    assert source["order_id"].iloc[0] == before
+    with pytest.raises(dl.SharedTablesModified):
+        frame, _ = tables
@@ -0,0 +1,249 @@
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import data_loader as dl
+
+
+# ---------------------------------------------------------------------------
+# Timestamp parsing
+# ---------------------------------------------------------------------------
+
+def test_parse_timestamps_without_fractions():
+    values = pd.Series(pd.date_range("2023-01-01", periods=1_000, freq="min")
+                       .strftime("%Y-%m-%d %H:%M:%S"))
+    parsed, n_coerced = dl.parse_timestamps(values)
+    assert n_coerced == 0
+    assert (parsed == pd.to_datetime(values)).all()
+
+
+def test_parse_timestamps_mixed_layouts_and_garbage():
+    values = pd.Series([
+        "2023-01-02 03:04:05.123456",
+        "2023-01-02 03:04:05",
+        "2023-01-02",
+        "2023-01-02T03:04:05.5",
+        "not a date",
+        "2023-13-45 00:00:00",
+        None,
+    ])
+    parsed, n_coerced = dl.parse_timestamps(values)
+    expected = values.map(lambda v: pd.to_datetime(v, errors="coerce"))
+    assert parsed.tolist() == expected.tolist()
+    assert n_coerced == 2
+    assert int(parsed.isna().sum()) == 3
+
+
+def test_parse_timestamps_irregular_fractions_are_kept():
+    # No row matches the fixed layout, so the first pass finds no unit.
+    values = pd.Series(["2023-01-01 00:00:00", "2023-01-01T00:00:00.5"])
+    parsed, n_coerced = dl.parse_timestamps(values)
+    assert n_coerced == 0
+    assert parsed[1] - parsed[0] == pd.Timedelta(milliseconds=500)
+
+
+def test_parse_timestamps_leaves_datetimes_alone():
+    values = pd.Series(pd.to_datetime(["2023-01-01", None]))
+    parsed, n_coerced = dl.parse_timestamps(values)
+    assert parsed is values and n_coerced == 0
+    assert np.isnat(parsed.to_numpy()[1])
+
+
+# ---------------------------------------------------------------------------
+# Appended snapshots
+# ---------------------------------------------------------------------------
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.dirname(
+    os.path.abspath(__file__))), "ecommerce_data")
+
+
+def _lines(name):
+    with open(os.path.join(DATA_DIR, dl.DATASET_FILES[name]), "rb") as fh:
+        return fh.readlines()
+
+
+def _write(data_dir, name, lines, mode="wb"):
+    with open(os.path.join(data_dir, dl.DATASET_FILES[name]), mode) as fh:
+        fh.writelines(lines)
+
+
+def _load(data_dir, **kwargs):
+    return dl.load_datasets(data_dir, tables=["orders"], return_report=True,
+                            **kwargs)
+
+
+def _assert_fresh(data_dir, datasets):
+    """*datasets* equal a load that ignores the snapshot."""
+    fresh = dl.load_datasets(data_dir, use_snapshot=False, tables=["orders"])
+    pd.testing.assert_frame_equal(datasets["orders"], fresh["orders"])
+
+
+@pytest.fixture
+def orders_dir(tmp_path):
+    """The first 3,000 orders, with a snapshot already taken."""
+    _write(tmp_path, "orders", _lines("orders")[:3001])
+    _, report = _load(tmp_path)
+    assert report["orders"]["source"] == "csv"
+    return tmp_path
+
+
+def _previous_rows():
+    return {"orders": 3000}
+
+
+def test_unchanged_csv_reads_the_snapshot(orders_dir):
+    datasets, report = _load(orders_dir)
+    assert report["orders"]["source"] == "snapshot"
+    assert report["orders"]["appended_rows"] == 0
+    assert dl.appended_since(report, _previous_rows()) == {"orders": 3000}
+    _assert_fresh(orders_dir, datasets)
+
+
+def test_appended_rows_are_parsed_alone(orders_dir):
+    _write(orders_dir, "orders", _lines("orders")[3001:5001], mode="ab")
+    datasets, report = _load(orders_dir)
+    assert report["orders"]["source"] == "append"
+    assert report["orders"]["appended_rows"] == 2000
+    assert dl.appended_since(report, _previous_rows()) == {"orders": 3000}
+    assert dl.appended_since(report, _previous_rows(), append_only=()) is None
+    _assert_fresh(orders_dir, datasets)
+
+    # The grown snapshot is the new high-water mark.
+    datasets, report = _load(orders_dir)
+    assert report["orders"]["source"] == "snapshot"
+    _assert_fresh(orders_dir, datasets)
+
+
+def test_appended_tail_without_newline(orders_dir):
+    appended = _lines("orders")[3001:3101]
+    appended[-1] = appended[-1].rstrip(b"\n")
+    _write(orders_dir, "orders", appended, mode="ab")
+    datasets, report = _load(orders_dir)
+    assert report["orders"]["source"] == "append"
+    assert report["orders"]["appended_rows"] == 100
+    _assert_fresh(orders_dir, datasets)
+
+
+def test_snapshot_of_a_tail_without_newline_is_rebuilt(tmp_path):
+    lines = _lines("orders")
+    head = lines[:3001]
+    head[-1] = head[-1].rstrip(b"\n")
+    _write(tmp_path, "orders", head)
+    _load(tmp_path)
+    # The next writer finishes the open line before appending.
+    _write(tmp_path, "orders", [b"\n"] + lines[3001:3101], mode="ab")
+    datasets, report = _load(tmp_path)
+    assert report["orders"]["source"] == "csv"
+    assert dl.appended_since(report, _previous_rows()) is None
+    assert len(datasets["orders"]) == 3100
+    _assert_fresh(tmp_path, datasets)
+
+
+@pytest.mark.parametrize("row", [1, 2990], ids=["head", "tail"])
+@pytest.mark.parametrize("grow", [False, True], ids=["same-size", "grown"])
+def test_rewritten_row_forces_a_rebuild(orders_dir, row, grow):
+    lines = _lines("orders")
+    head = lines[:3001]
+    # Same length, different content.
+    head[row] = head[row].replace(b"ord_", b"ORD_", 1)
+    assert head[row] != lines[row]
+    _write(orders_dir, "orders", head + (lines[3001:3101] if grow else []))
+    datasets, report = _load(orders_dir)
+    assert report["orders"]["source"] == "csv"
+    assert dl.appended_since(report, _previous_rows()) is None
+    _assert_fresh(orders_dir, datasets)
+
+
+def test_truncated_csv_forces_a_rebuild(orders_dir):
+    _write(orders_dir, "orders", _lines("orders")[:2001])
+    datasets, report = _load(orders_dir)
+    assert report["orders"]["source"] == "csv"
+    assert report["orders"]["rows"] == 2000
+    assert dl.appended_since(report, _previous_rows()) is None
+    _assert_fresh(orders_dir, datasets)
+
+
+# ---------------------------------------------------------------------------
+# Incremental refresh
+# ---------------------------------------------------------------------------
+
+_REFRESH_TABLES = ["orders", "order_items", "products", "customers",
+                   "reviews"]
+
+
+def _derive(data_dir, previous=None, **kwargs):
+    """Load *data_dir* and derive its tables the way the dashboard does."""
+    datasets, report = dl.load_datasets(data_dir, tables=_REFRESH_TABLES,
+                                        return_report=True, **kwargs)
+    since = dl.appended_since(report, previous and previous["rows"])
+    datasets, labels = dl.intern_keys(
+        datasets, labels=previous["labels"] if since is not None else None)
+    tables = dl.build_derived_tables(
+        datasets["order_items"], dl.parse_order_dates(datasets["orders"]),
+        datasets["products"], datasets["customers"], datasets["reviews"])
+    merged = None
+    if since is not None:
+        merged = dl.merge_appended(
+            dl.SharedTables(previous["tables"]), since,
+            datasets["order_items"], dl.parse_order_dates(datasets["orders"]),
+            datasets["products"], datasets["customers"], datasets["reviews"])
+    rows = {name: entry["rows"] for name, entry in report.items()}
+    return {"tables": tables, "merged": merged, "rows": rows,
+            "labels": labels, "since": since}
+
+
+def _assert_same_tables(merged, merged_labels, rebuilt, rebuilt_labels):
+    delivered, cube, prefix_sums = merged
+    full_delivered, full_cube, full_prefix_sums = rebuilt
+
+    key = ["order_purchase_timestamp", "order_id"]
+    delivered = (dl.decode_keys(delivered, merged_labels)
+                 .sort_values(key, ignore_index=True))
+    full_delivered = (dl.decode_keys(full_delivered, rebuilt_labels)
+                      .sort_values(key, ignore_index=True))
+    pd.testing.assert_frame_equal(delivered, full_delivered)
+
+    cells = list(dl.CUBE_DIMENSIONS)
+    pd.testing.assert_frame_equal(
+        cube.sort_values(cells, ignore_index=True),
+        full_cube.sort_values(cells, ignore_index=True))
+
+    np.testing.assert_array_equal(prefix_sums.days, full_prefix_sums.days)
+    for measure, cumulative in full_prefix_sums.cumulative.items():
+        np.testing.assert_allclose(prefix_sums.cumulative[measure],
+                                   cumulative)
+
+
+@pytest.mark.parametrize("orphans", [False, True],
+                         ids=["new-orders", "items-before-orders"])
+def test_merged_refresh_matches_a_full_rebuild(tmp_path, orphans):
+    for name in _REFRESH_TABLES:
+        _write(tmp_path, name, _lines(name))
+    orders, items = _lines("orders"), _lines("order_items")
+    cut = int(len(orders) * 0.8)
+    old_ids = {line.split(b",")[0] for line in orders[1:cut]}
+    old_items = [line for line in items[1:] if line.split(b",")[0] in old_ids]
+    new_items = [line for line in items[1:]
+                 if line.split(b",")[0] not in old_ids]
+    # With orphans, some items of the new orders arrive a load early.
+    early = len(new_items) // 2 if orphans else 0
+    _write(tmp_path, "orders", orders[:cut])
+    _write(tmp_path, "order_items",
+           items[:1] + old_items + new_items[:early])
+    first = _derive(tmp_path)
+
+    _write(tmp_path, "orders", orders[cut:], mode="ab")
+    _write(tmp_path, "order_items", new_items[early:], mode="ab")
+    second = _derive(tmp_path, previous=first)
+    assert second["since"]["orders"] == cut - 1
+    assert (second["since"]["order_items"]
+            == len(old_items) + early)
+    if orphans:
+        assert second["merged"] is None
+        return
+
+    rebuilt = _derive(tmp_path, use_snapshot=False)
+    _assert_same_tables(second["merged"], second["labels"],
+                        rebuilt["tables"], rebuilt["labels"])
@@ -0,0 +1,27 @@
+import os
+
+import data_loader as dl
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.dirname(
+    os.path.abspath(__file__))), "ecommerce_data")
+
+
+def test_default_collect_has_one_row_per_delivered_item():
+    datasets = dl.load_datasets(DATA_DIR, use_snapshot=False,
+                                tables=["orders", "order_items"])
+    orders = dl.parse_order_dates(datasets["orders"])
+    delivered = dl.filter_delivered(
+        dl.build_sales_data(datasets["order_items"], orders))
+
+    sales = dl.scan(DATA_DIR, use_snapshot=False).delivered().collect()
+    assert "review_score" not in sales.columns
+    assert len(sales) == len(delivered)
+    assert not sales.duplicated(["order_id", "order_item_id"]).any()
+
+
+def test_review_score_is_collected_when_asked_for():
+    plan = dl.scan(DATA_DIR, use_snapshot=False).delivered()
+    sales = plan.collect(["order_id", "review_score"])
+    assert list(sales.columns) == ["order_id", "review_score"]
+    assert "reviews" in plan.explain(columns=["review_score"])
+    assert "reviews" not in plan.explain()
@@ -0,0 +1,61 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from types import MappingProxyType
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from result_cache import ResultCache, estimate_nbytes
+
+
+def test_read_only_mappings_are_sized_by_their_items():
+    frame = pd.DataFrame({"value": np.arange(10_000, dtype="float64")})
+    items = {"frame": frame, "total": 1.0}
+    assert estimate_nbytes(MappingProxyType(items)) > frame["value"].nbytes
+
+
+def test_nested_values_count_towards_the_budget():
+    cache = ResultCache(max_bytes=100_000)
+    big = MappingProxyType({"values": np.zeros(10_000)})  # 80 kB
+    cache.put("a", big)
+    cache.put("b", big)
+    assert cache.get("a") is None
+    assert cache.get("b") is big
+    assert cache.evictions == 1
+
+
+def test_concurrent_misses_compute_once():
+    cache = ResultCache(max_bytes=1 << 20)
+    started = threading.Event()
+    release = threading.Event()
+    calls = []
+
+    def compute():
+        calls.append(1)
+        started.set()
+        release.wait(5)
+        return "value"
+
+    with ThreadPoolExecutor(max_workers=3) as pool:
+        first = pool.submit(cache.get_or_compute, "key", compute)
+        started.wait(5)
+        others = [pool.submit(cache.get_or_compute, "key", compute)
+                  for _ in range(2)]
+        release.set()
+        results = [f.result(5) for f in [first] + others]
+    assert results == ["value"] * 3
+    assert len(calls) == 1
+    assert (cache.misses, cache.hits) == (1, 2)
+
+
+def test_failed_compute_is_not_cached():
+    cache = ResultCache(max_bytes=1 << 20)
+
+    def fail():
+        raise RuntimeError("boom")
+
+    with pytest.raises(RuntimeError):
+        cache.get_or_compute("key", fail)
+    assert "key" not in cache
+    assert cache.get_or_compute("key", lambda: 1) == 1
@@ -0,0 +1,85 @@
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import business_metrics as bm
+import data_loader as dl
+import streaming
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.dirname(
+    os.path.abspath(__file__))), "ecommerce_data")
+
+# Small and prime, so chunk boundaries fall inside orders' item runs.
+CHUNKSIZE = 997
+
+
+@pytest.fixture(scope="module")
+def tables():
+    datasets = dl.load_datasets(DATA_DIR, use_snapshot=False)
+    orders = dl.parse_order_dates(datasets["orders"])
+    delivered = dl.add_delivery_speed(
+        dl.filter_delivered(dl.build_sales_data(datasets["order_items"],
+                                                orders)))
+    return datasets, orders, delivered
+
+
+def test_chunks_split_orders(tables):
+    datasets, _, _ = tables
+    order_ids = datasets["order_items"]["order_id"].to_numpy()
+    boundaries = np.arange(CHUNKSIZE, len(order_ids), CHUNKSIZE)
+    assert (order_ids[boundaries - 1] == order_ids[boundaries]).any()
+
+
+@pytest.mark.parametrize("start_date, end_date", [
+    (None, None),
+    ("2022-03-15", "2023-04-02"),
+    ("2030-01-01", "2030-02-01"),
+], ids=["open", "bounded", "empty"])
+def test_streamed_kpis_match_in_memory(tables, start_date, end_date):
+    datasets, orders, delivered = tables
+    if start_date is not None:
+        delivered = dl.filter_by_date_range(delivered, start_date, end_date)
+    summary = bm.review_delivery_summary(delivered, datasets["reviews"])
+
+    streamed = streaming.stream_kpis(DATA_DIR, start_date, end_date,
+                                     chunksize=CHUNKSIZE)
+
+    kpis = bm.compute_kpis(delivered)
+    assert streamed.total_revenue == pytest.approx(kpis.revenue)
+    assert streamed.total_orders == kpis.orders
+    assert streamed.average_order_value == pytest.approx(
+        kpis.average_order_value, nan_ok=True)
+    assert streamed.average_mom_growth == pytest.approx(
+        kpis.average_mom_growth, nan_ok=True)
+    pd.testing.assert_frame_equal(streamed.monthly_revenue,
+                                  bm.monthly_revenue(delivered))
+
+    by_category = bm.revenue_by_category(delivered, datasets["products"])
+    assert list(streamed.revenue_by_category.index) == list(by_category.index)
+    assert streamed.revenue_by_category.dtype == np.float64
+    np.testing.assert_allclose(streamed.revenue_by_category, by_category)
+
+    by_state = bm.revenue_by_state(delivered, orders, datasets["customers"])
+    assert (list(streamed.revenue_by_state["customer_state"])
+            == list(by_state["customer_state"]))
+    assert streamed.revenue_by_state["revenue"].dtype == np.float64
+    np.testing.assert_allclose(streamed.revenue_by_state["revenue"],
+                               by_state["revenue"])
+
+    assert streamed.review_count == len(summary)
+    assert streamed.average_review_score == pytest.approx(
+        bm.average_review_score(summary), nan_ok=True)
+    assert streamed.average_delivery_days == pytest.approx(
+        bm.average_delivery_days(summary), nan_ok=True)
+
+
+def test_empty_window_sums_are_float_zero():
+    streamed = streaming.stream_kpis(DATA_DIR, "2030-01-01", "2030-02-01",
+                                     chunksize=CHUNKSIZE)
+    assert streamed.total_revenue == 0.0
+    assert isinstance(streamed.total_revenue, float)
+    assert streamed.total_orders == 0
+    assert streamed.monthly_revenue.empty
+    assert streamed.monthly_revenue["revenue"].dtype == np.float64